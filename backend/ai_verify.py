@@ -7,13 +7,80 @@ For GitHub URLs: fetches repo metadata, README, and file tree first.
 import os
 import re
 import json
+import time
+import random
+import asyncio
+import ipaddress
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from dotenv import load_dotenv
 
+import metrics
+import tracing
+
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
 
+# API base URLs — override to point at fake_services.py for offline runs
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta").rstrip("/")
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+# Approximate token budget for the fetched repository context in the prompt
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "2500"))
+
+# Gemini call resilience: total time budget per verify_proof (seconds, incl.
+# retries), retry count for 429/5xx/timeouts, and circuit breaker settings.
+GEMINI_LATENCY_BUDGET = float(os.getenv("GEMINI_LATENCY_BUDGET", "20"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+GEMINI_BREAKER_THRESHOLD = int(os.getenv("GEMINI_BREAKER_THRESHOLD", "5"))
+GEMINI_BREAKER_COOLDOWN = float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30"))
+
+# Floor for the retry_after of deferred verdicts (and their Retry-After header);
+# a half-open breaker's own retry_after() is 0 while its trial call runs
+GEMINI_MIN_RETRY_AFTER = 5.0
+
+# Redirects followed (each hop re-checked) when pre-screening a proof URL
+PRESCREEN_MAX_REDIRECTS = int(os.getenv("PRESCREEN_MAX_REDIRECTS", "5"))
+
+# GitHub response cache: entries are served as-is for the TTL, then
+# revalidated with If-None-Match / If-Modified-Since (304s are free).
+GITHUB_CACHE_TTL = int(os.getenv("GITHUB_CACHE_TTL", "300"))
+GITHUB_CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_CACHE_MAX_ENTRIES", "2000"))
+
+# { url: { status, data, etag, last_modified, fetched_at } }
+_github_cache: dict = {}
+
+# One pooled HTTP client for GitHub, Gemini and proof URL checks. Building an
+# AsyncClient loads the CA bundle into a new SSL context (~50 ms) and a
+# per-call client never reuses a connection. Pools can't cross event loops,
+# so the client belongs to the loop that created it.
+_http_client = None
+_http_client_loop = None
+
+
+def get_http_client(loop: Optional[asyncio.AbstractEventLoop] = None):
+    """
+    The shared httpx.AsyncClient for `loop` (default: the running loop).
+    main.py builds it during startup warm-up and closes it on shutdown.
+    """
+    global _http_client, _http_client_loop
+    loop = loop or asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        import httpx
+        _http_client = httpx.AsyncClient(timeout=15.0)
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared client's pooled connections (app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 def _parse_github_url(url: str) -> tuple:
     """Extract owner/repo from a GitHub URL. Returns (owner, repo) or (None, None)."""
@@ -29,90 +96,646 @@ def _parse_github_url(url: str) -> tuple:
     return None, None
 
 
-async def _fetch_github_context(owner: str, repo: str) -> str:
-    """Fetch repo info, README, file tree, and languages from GitHub API."""
-    import httpx
+async def _github_get(client, url: str, headers: dict) -> tuple:
+    """
+    GET a GitHub API URL through the response cache.
+
+    Fresh entries are returned without a request. Stale entries that carry an
+    ETag or Last-Modified are revalidated with a conditional request; a 304
+    refreshes the entry and reuses the cached body.
+
+    Returns:
+        (status_code, parsed_json_or_None)
+    """
+    now = time.monotonic()
+    entry = _github_cache.get(url)
+    if entry and now - entry["fetched_at"] < GITHUB_CACHE_TTL:
+        metrics.CACHE_REQUESTS.inc(cache="github", result="hit")
+        return entry["status"], entry["data"]
+
+    with tracing.span("github.get", url=url, revalidate=entry is not None) as span:
+        status, data = await _github_request(client, url, headers, entry, now)
+        span.set_attribute("http.status_code", status)
+    return status, data
 
-    context_parts = []
+
+async def _github_request(client, url: str, headers: dict, entry: Optional[dict], now: float) -> tuple:
+    """The network half of _github_get: conditional GET and cache update."""
+    request_headers = dict(headers)
+    if entry:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    resp = await client.get(url, headers=request_headers)
+
+    if resp.status_code == 304 and entry:
+        metrics.CACHE_REQUESTS.inc(cache="github", result="revalidated")
+        entry["fetched_at"] = now
+        return entry["status"], entry["data"]
+
+    metrics.CACHE_REQUESTS.inc(cache="github", result="miss")
+
+    data = resp.json() if resp.status_code == 200 else None
+    if resp.status_code in (200, 404):
+        _github_cache.pop(url, None)
+        if len(_github_cache) >= GITHUB_CACHE_MAX_ENTRIES:
+            # Evict the oldest entry (dicts keep insertion order)
+            _github_cache.pop(next(iter(_github_cache)))
+        _github_cache[url] = {
+            "status": resp.status_code,
+            "data": data,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "fetched_at": now,
+        }
+    return resp.status_code, data
+
+
+async def _fetch_github_context(owner: str, repo: str) -> dict:
+    """
+    Fetch repo info, languages, file tree, and README from the GitHub API.
+
+    Returns the raw pieces rather than a rendered string so the prompt
+    builder can decide what fits in the token budget:
+        { repo: dict, repo_status: int|None, languages: dict, tree: list,
+          tree_status: int|None, readme: str }
+    Missing pieces are left empty; repo_status and tree_status are None if
+    GitHub was unreachable (tree_status also if the repo info is missing).
+    """
+    context = {"repo": {}, "repo_status": None, "languages": {}, "tree": [], "tree_status": None, "readme": ""}
     headers = {"Accept": "application/vnd.github.v3+json", "User-Agent": "GigBounty-AI"}
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        # 1. Repo info
+    base = f"{GITHUB_API_URL}/repos/{owner}/{repo}"
+
+    client = get_http_client()
+    # 1. Repo info
+    try:
+        status, data = await _github_get(client, base, headers)
+        context["repo_status"] = status
+        if status == 200:
+            context["repo"] = data
+    except Exception:
+        pass
+
+    # 2. Languages
+    try:
+        status, data = await _github_get(client, f"{base}/languages", headers)
+        if status == 200:
+            context["languages"] = data or {}
+    except Exception:
+        pass
+
+    # 3. File tree of the default branch (recursive)
+    branch = context["repo"].get("default_branch")
+    try:
+        if branch:
+            status, data = await _github_get(client, f"{base}/git/trees/{branch}?recursive=1", headers)
+            context["tree_status"] = status
+            if status == 200:
+                context["tree"] = [
+                    {"path": t["path"], "type": t["type"]}
+                    for t in data.get("tree", [])
+                ]
+    except Exception:
+        pass
+
+    # 4. README
+    try:
+        status, data = await _github_get(client, f"{base}/readme", headers)
+        if status == 200:
+            import base64
+            content = data.get("content", "")
+            try:
+                context["readme"] = base64.b64decode(content).decode("utf-8", errors="replace")
+            except Exception:
+                pass
+    except Exception:
+        pass
+
+    return context
+
+
+# ─── Prompt Building ─────────────────────────────────────────
+
+# Files that reveal the tech stack and dependencies at a glance
+MANIFEST_FILES = {
+    "package.json", "requirements.txt", "pyproject.toml", "setup.py", "setup.cfg",
+    "pipfile", "cargo.toml", "go.mod", "pom.xml", "build.gradle", "build.gradle.kts",
+    "gemfile", "composer.json", "pubspec.yaml", "dockerfile", "docker-compose.yml",
+    "docker-compose.yaml", "makefile", "vite.config.js", "vite.config.ts",
+    "tsconfig.json", "next.config.js", "hardhat.config.js", "foundry.toml",
+}
+
+_STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "you", "your", "are",
+    "have", "has", "will", "should", "must", "can", "use", "using", "into",
+    "all", "any", "not", "but", "its", "our", "their", "them", "build", "make",
+    "create", "need", "needs", "please", "also", "each", "add", "given", "project",
+}
+
+# Section render order and relative priority of each kind of context
+_SECTION_ORDER = [
+    ("manifest", "MANIFEST FILES"),
+    ("relevant", "FILES MATCHING TASK KEYWORDS"),
+    ("outline", "README OUTLINE"),
+    ("readme", "README EXCERPTS"),
+    ("tree", "OTHER FILES"),
+]
+_SECTION_WEIGHT = {"manifest": 3.0, "outline": 2.5, "relevant": 2.0, "readme": 1.0, "tree": 0.2}
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars per token) — good enough for budgeting."""
+    return len(text) // 4 + 1
+
+
+def _task_keywords(task_description: str) -> set:
+    """Lower-cased content words from the task description."""
+    words = re.findall(r"[a-zA-Z][a-zA-Z0-9+#.-]{2,}", task_description.lower())
+    return {w.strip(".-") for w in words if w not in _STOPWORDS}
+
+
+def _keyword_hits(text: str, keywords: set) -> int:
+    """Number of task keywords that appear in the text."""
+    text = text.lower()
+    return sum(1 for k in keywords if k in text)
+
+
+def _split_readme(readme: str) -> list:
+    """Split a README into (heading, body) chunks on markdown headings."""
+    chunks = []
+    heading, body = "", []
+    for line in readme.splitlines():
+        if re.match(r"^#{1,6}\s", line):
+            if heading or any(b.strip() for b in body):
+                chunks.append((heading, "\n".join(body).strip()))
+            heading, body = line.strip(), []
+        else:
+            body.append(line)
+    if heading or any(b.strip() for b in body):
+        chunks.append((heading, "\n".join(body).strip()))
+    return chunks
+
+
+def _rank_context(task_description: str, context: dict) -> list:
+    """
+    Break fetched repo context into candidate items and score them.
+
+    Returns a list of (score, section, order, text), highest score first.
+    """
+    keywords = _task_keywords(task_description)
+    items = []
+
+    # Tree entries: manifests first, then paths matching task keywords
+    for i, entry in enumerate(context.get("tree", [])):
+        path = entry["path"]
+        icon = "📁" if entry["type"] == "tree" else "📄"
+        line = f"  {icon} {path}"
+        name = path.rsplit("/", 1)[-1].lower()
+        depth = path.count("/")
+        hits = _keyword_hits(path, keywords)
+        if entry["type"] == "blob" and name in MANIFEST_FILES:
+            items.append((_SECTION_WEIGHT["manifest"] - 0.1 * depth, "manifest", i, line))
+        elif hits:
+            items.append((_SECTION_WEIGHT["relevant"] + 0.5 * hits - 0.05 * depth, "relevant", i, line))
+        else:
+            items.append((_SECTION_WEIGHT["tree"] - 0.02 * depth, "tree", i, line))
+
+    # README: headings form an outline, bodies become excerpts
+    for i, (heading, body) in enumerate(_split_readme(context.get("readme", ""))):
+        hits = _keyword_hits(heading + " " + body, keywords)
+        if heading:
+            items.append((_SECTION_WEIGHT["outline"] + 0.2 * hits, "outline", i, heading))
+        if body:
+            if len(body) > 1200:
+                body = body[:1200] + "\n... [TRUNCATED]"
+            excerpt = f"{heading}\n{body}" if heading else body
+            # Earlier sections usually carry the overview; decay with position
+            score = _SECTION_WEIGHT["readme"] + 0.5 * hits - 0.05 * i
+            items.append((score, "readme", i, excerpt))
+
+    items.sort(key=lambda it: -it[0])
+    return items
+
+
+def _render_header(context: dict) -> list:
+    """Always-included repo metadata lines."""
+    lines = []
+    data = context.get("repo") or {}
+    if data:
+        lines.append(f"REPO: {data.get('full_name', '')}")
+        lines.append(f"DESCRIPTION: {data.get('description', 'No description')}")
+        lines.append(f"LANGUAGE: {data.get('language', 'Unknown')}")
+        lines.append(f"STARS: {data.get('stargazers_count', 0)} | FORKS: {data.get('forks_count', 0)}")
+        lines.append(f"CREATED: {data.get('created_at', '')} | UPDATED: {data.get('updated_at', '')}")
+        lines.append(f"SIZE: {data.get('size', 0)} KB")
+        topics = data.get("topics", [])
+        if topics:
+            lines.append(f"TOPICS: {', '.join(topics)}")
+
+    langs = context.get("languages") or {}
+    if langs:
+        total = sum(langs.values()) or 1
+        lang_str = ", ".join(f"{k}: {v/total*100:.1f}%" for k, v in sorted(langs.items(), key=lambda x: -x[1]))
+        lines.append(f"LANGUAGE BREAKDOWN: {lang_str}")
+
+    tree = context.get("tree", [])
+    if tree:
+        lines.append(f"FILE TREE: {len(tree)} total entries")
+    return lines
+
+
+def build_github_context(task_description: str, context: dict, token_budget: int = None) -> str:
+    """
+    Render fetched repo context into prompt text that fits within a token budget.
+
+    Repo metadata is always included. The remaining budget is filled greedily
+    with the highest-ranked items: manifest files, README headings, paths that
+    match task keywords, README excerpts, then the rest of the file tree.
+    """
+    if token_budget is None:
+        token_budget = PROMPT_TOKEN_BUDGET
+
+    header = _render_header(context)
+    if not header and not context.get("readme"):
+        return "Could not fetch repository data."
+
+    used = _estimate_tokens("\n".join(header))
+    chosen = {key: [] for key, _ in _SECTION_ORDER}
+    skipped = 0
+    for _score, section, order, text in _rank_context(task_description, context):
+        cost = _estimate_tokens(text)
+        if used + cost > token_budget:
+            skipped += 1
+            continue
+        chosen[section].append((order, text))
+        used += cost
+
+    parts = ["\n".join(header)] if header else []
+    for key, title in _SECTION_ORDER:
+        if chosen[key]:
+            sep = "\n\n" if key == "readme" else "\n"
+            body = sep.join(text for _, text in sorted(chosen[key]))
+            parts.append(f"{title}:\n{body}")
+    if skipped:
+        parts.append(f"... {skipped} lower-priority items omitted to fit the prompt budget")
+
+    return "\n\n".join(parts)
+
+
+# ─── Pre-screen ──────────────────────────────────────────────
+
+# Files that don't count as "work" when checking whether a repo has content
+_BOILERPLATE_FILES = {"readme.md", "readme", "readme.txt", "license", "license.md", ".gitignore"}
+
+
+def _parse_deadline(deadline: Optional[str]) -> Optional[datetime]:
+    """Parse a task deadline ("YYYY-MM-DD" or ISO datetime) as naive UTC; date-only means end of day."""
+    if not deadline:
+        return None
+    try:
+        if len(deadline) == 10:
+            return datetime.fromisoformat(deadline) + timedelta(days=1)
+        parsed = datetime.fromisoformat(deadline.replace("Z", "+00:00"))
+        if parsed.tzinfo:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    except ValueError:
+        return None
+
+
+def prescreen_github(context: dict, deadline: Optional[str] = None) -> dict:
+    """
+    Cheap rule-based checks on fetched GitHub metadata, run before the LLM.
+
+    Returns:
+        { verdict: "FAIL"|None, rule: str|None, reason: str, flags: list }
+        A verdict means the proof is decided and Gemini should not be called.
+        Flags are gaps worth pointing out to the model but not decisive.
+    """
+    result = {"verdict": None, "rule": None, "reason": "", "flags": []}
+
+    def fail(rule: str, reason: str) -> dict:
+        result.update(verdict="FAIL", rule=rule, reason=reason)
+        return result
+
+    if context.get("repo_status") == 404:
+        return fail("repo_not_found", "The repository does not exist or is private.")
+
+    repo = context.get("repo") or {}
+    tree = context.get("tree", [])
+    if not repo:
+        # GitHub unreachable or rate-limited — nothing to decide on
+        return result
+
+    # GitHub answers 409 for the tree of a repository without commits; any
+    # other non-200 (rate limit, timeout, 5xx) says nothing about the files
+    if context.get("tree_status") == 409 and repo.get("size", 0) == 0:
+        return fail("empty_repo", "The repository is empty (no commits).")
+    if context.get("tree_status") != 200:
+        return result
+
+    files = [t["path"] for t in tree if t["type"] == "blob"]
+    if not files:
+        return fail("no_files", "The repository contains no files.")
+
+    due = _parse_deadline(deadline)
+    created = _parse_deadline(repo.get("created_at"))
+    if due and created and created > due:
+        return fail(
+            "created_after_deadline",
+            f"The repository was created ({repo.get('created_at')}) after the task deadline ({deadline})."
+        )
+
+    if all(f.rsplit("/", 1)[-1].lower() in _BOILERPLATE_FILES for f in files):
+        result["flags"].append("only_boilerplate_files")
+    if not context.get("readme"):
+        result["flags"].append("missing_readme")
+    if not context.get("languages"):
+        result["flags"].append("no_detected_languages")
+    return result
+
+
+async def _is_public_host(host: str) -> bool:
+    """True if every address `host` resolves to is globally routable (not private, loopback, link-local...)."""
+    try:
+        addresses = [ipaddress.ip_address(host.strip("[]"))]
+    except ValueError:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, None)
+        addresses = [ipaddress.ip_address(info[4][0].split("%")[0]) for info in infos]
+    return bool(addresses) and all(address.is_global for address in addresses)
+
+
+async def prescreen_url(url: str) -> dict:
+    """
+    Check that a non-GitHub proof URL is reachable. Only definitive failures
+    (404, 410, or a host that is not publicly routable) short-circuit; a
+    connection error may be on our side, so it is only flagged and the
+    proof is left to the LLM.
+
+    The URL is fetched by the server, so every hop — the URL and each
+    redirect, followed manually — must resolve to public addresses only;
+    internal services and cloud metadata endpoints are never requested.
+    """
+    import httpx
+
+    result = {"verdict": None, "rule": None, "reason": "", "flags": []}
+    current = url.strip()
+    if not re.match(r"^https?://", current):
+        return result
+
+    client = get_http_client()
+    for _ in range(PRESCREEN_MAX_REDIRECTS + 1):
         try:
-            resp = await client.get(f"https://api.github.com/repos/{owner}/{repo}", headers=headers)
-            if resp.status_code == 200:
-                data = resp.json()
-                context_parts.append(f"REPO: {data.get('full_name', '')}")
-                context_parts.append(f"DESCRIPTION: {data.get('description', 'No description')}")
-                context_parts.append(f"LANGUAGE: {data.get('language', 'Unknown')}")
-                context_parts.append(f"STARS: {data.get('stargazers_count', 0)} | FORKS: {data.get('forks_count', 0)}")
-                context_parts.append(f"CREATED: {data.get('created_at', '')} | UPDATED: {data.get('updated_at', '')}")
-                context_parts.append(f"SIZE: {data.get('size', 0)} KB")
-                topics = data.get("topics", [])
-                if topics:
-                    context_parts.append(f"TOPICS: {', '.join(topics)}")
+            target = httpx.URL(current)
+            if target.scheme not in ("http", "https") or not target.host:
+                return result
+            if not await _is_public_host(target.host):
+                result.update(
+                    verdict="FAIL", rule="url_not_public",
+                    reason="The proof URL points to a private or internal address.",
+                )
+                return result
+            resp = await client.head(current, timeout=5.0)
+            if resp.status_code == 405:
+                resp = await client.get(current, timeout=5.0)
+        except (OSError, httpx.ConnectError):
+            # DNS or connection failure — possibly transient on our side
+            result["flags"].append("url_unreachable")
+            return result
         except Exception:
-            pass
+            return result
+        if resp.next_request is None:
+            break
+        current = str(resp.next_request.url)
+    else:
+        result["flags"].append("too_many_redirects")
+        return result
+
+    if resp.status_code in (404, 410):
+        result.update(
+            verdict="FAIL", rule="url_not_found",
+            reason=f"The proof URL returned HTTP {resp.status_code}."
+        )
+    return result
+
+
+def _prescreen_result(screen: dict) -> dict:
+    """verify_proof result for a proof decided by the pre-screen."""
+    return {
+        "score": 0,
+        "verdict": screen["verdict"],
+        "reasoning": f"Pre-screen: {screen['reason']}",
+        "audit_report": f"Decided without AI review by pre-screen rule `{screen['rule']}`.",
+        "prescreen": screen,
+    }
+
+
+# ─── Gemini Call ─────────────────────────────────────────────
+
+
+class GeminiUnavailable(Exception):
+    """Gemini could not answer within the latency budget (or the breaker is open)."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    CLOSED: calls pass through. After `threshold` consecutive failures it
+    OPENs and rejects calls for `cooldown` seconds, then lets a single trial
+    call through (HALF_OPEN). A success closes it again; a failure re-opens it.
+    A trial that ends any other way (cancelled, unexpected error, a response
+    that proves nothing) must call release_trial() so another can go through.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "CLOSED"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "HALF_OPEN"
+        return "OPEN"
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker will let a trial call through."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "CLOSED":
+            return True
+        if state == "HALF_OPEN" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def release_trial(self):
+        """End a HALF_OPEN trial without a verdict; the next call becomes the trial."""
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+_gemini_breaker = CircuitBreaker(GEMINI_BREAKER_THRESHOLD, GEMINI_BREAKER_COOLDOWN)
+
 
-        # 2. Languages
+def _backoff_delay(attempt: int, retry_after_header: Optional[str] = None) -> float:
+    """Exponential backoff with full jitter, honouring a Retry-After header."""
+    if retry_after_header:
         try:
-            resp = await client.get(f"https://api.github.com/repos/{owner}/{repo}/languages", headers=headers)
-            if resp.status_code == 200:
-                langs = resp.json()
-                if langs:
-                    total = sum(langs.values())
-                    lang_str = ", ".join(f"{k}: {v/total*100:.1f}%" for k, v in sorted(langs.items(), key=lambda x: -x[1]))
-                    context_parts.append(f"LANGUAGE BREAKDOWN: {lang_str}")
-        except Exception:
+            return float(retry_after_header)
+        except ValueError:
             pass
+    return random.uniform(0, min(8.0, 0.5 * (2 ** attempt)))
+
+
+@tracing.traced("gemini.generate_content")
+async def _call_gemini(prompt: str):
+    """
+    POST the prompt to Gemini within GEMINI_LATENCY_BUDGET.
+
+    Retries 429/5xx responses and timeouts with jittered backoff while the
+    budget allows. Every failed attempt counts towards the circuit breaker,
+    as does a rejected API key (401/403, or 400 API_KEY_INVALID), which is
+    not retried. Other 4xx responses neither open nor close the breaker.
+
+    Returns:
+        The httpx response for any non-retryable status (200 or 4xx).
+
+    Raises:
+        GeminiUnavailable if the breaker is open or the budget/retries ran out.
+    """
+    trial = _gemini_breaker.state == "HALF_OPEN"
+    if not _gemini_breaker.allow():
+        raise GeminiUnavailable(
+            "Gemini circuit breaker is open after repeated failures",
+            _gemini_breaker.retry_after(),
+        )
+    try:
+        return await _post_gemini(prompt)
+    finally:
+        if trial:
+            _gemini_breaker.release_trial()
+
+
+def _rejected_key(response) -> bool:
+    """Gemini refused the API key itself (invalid, revoked or without access)."""
+    return response.status_code in (401, 403) or (
+        response.status_code == 400 and "API_KEY_INVALID" in response.text
+    )
 
-        # 3. File tree (top-level + one level deep)
+
+async def _post_gemini(prompt: str):
+    import httpx
+
+    api_url = f"{GEMINI_API_BASE}/models/{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
+    payload = {
+        "contents": [
+            {
+                "parts": [
+                    {"text": prompt}
+                ]
+            }
+        ],
+        "generationConfig": {
+            "temperature": 0.3,
+            "maxOutputTokens": 2000,
+            "responseMimeType": "application/json",
+        }
+    }
+    deadline = time.monotonic() + GEMINI_LATENCY_BUDGET
+    last_error = "no attempts made"
+
+    client = get_http_client()
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        retry_after_header = None
         try:
-            resp = await client.get(
-                f"https://api.github.com/repos/{owner}/{repo}/git/trees/main?recursive=1",
-                headers=headers
+            response = await client.post(
+                api_url,
+                headers={"Content-Type": "application/json"},
+                json=payload,
+                timeout=min(45.0, remaining),
             )
-            if resp.status_code != 200:
-                # Try 'master' branch
-                resp = await client.get(
-                    f"https://api.github.com/repos/{owner}/{repo}/git/trees/master?recursive=1",
-                    headers=headers
-                )
-            if resp.status_code == 200:
-                tree = resp.json().get("tree", [])
-                # Show first 80 files
-                file_list = [f"  {'📁' if t['type'] == 'tree' else '📄'} {t['path']}" for t in tree[:80]]
-                context_parts.append(f"FILE TREE ({len(tree)} total files):\n" + "\n".join(file_list))
-                if len(tree) > 80:
-                    context_parts.append(f"  ... and {len(tree) - 80} more files")
-        except Exception:
-            pass
+            if _rejected_key(response):
+                _gemini_breaker.record_failure()
+                return response
+            if response.status_code < 300:
+                _gemini_breaker.record_success()
+                return response
+            if response.status_code != 429 and response.status_code < 500:
+                return response
+            last_error = f"Gemini API error ({response.status_code}): {response.text[:200]}"
+            retry_after_header = response.headers.get("Retry-After")
+        except httpx.TimeoutException:
+            last_error = "Gemini request timed out"
+        except httpx.TransportError as e:
+            last_error = f"Gemini connection error: {e}"
+
+        _gemini_breaker.record_failure()
+        if _gemini_breaker.state != "CLOSED" or attempt == GEMINI_MAX_RETRIES:
+            break
+        delay = _backoff_delay(attempt, retry_after_header)
+        if time.monotonic() + delay >= deadline:
+            break
+        await asyncio.sleep(delay)
+
+    raise GeminiUnavailable(last_error, _gemini_breaker.retry_after())
 
-        # 4. README
-        try:
-            resp = await client.get(f"https://api.github.com/repos/{owner}/{repo}/readme", headers=headers)
-            if resp.status_code == 200:
-                import base64
-                content = resp.json().get("content", "")
-                try:
-                    readme_text = base64.b64decode(content).decode("utf-8", errors="replace")
-                    # Truncate to ~3000 chars
-                    if len(readme_text) > 3000:
-                        readme_text = readme_text[:3000] + "\n... [TRUNCATED]"
-                    context_parts.append(f"README:\n{readme_text}")
-                except Exception:
-                    pass
-        except Exception:
-            pass
 
-    return "\n\n".join(context_parts) if context_parts else "Could not fetch repository data."
+def _deferred_result(reason: str, retry_after: float) -> dict:
+    """Verdict for proofs that could not be judged right now — re-queue, don't fail."""
+    return {
+        "score": 0,
+        "verdict": "DEFERRED",
+        "reasoning": f"AI verification deferred: {reason}",
+        "audit_report": "",
+        "retry_after": int(max(retry_after, GEMINI_MIN_RETRY_AFTER) + 0.999),
+    }
 
 
-async def verify_proof(task_description: str, proof_url: str) -> dict:
+@tracing.traced("ai_verify.verify_proof")
+async def verify_proof(task_description: str, proof_url: str, deadline: Optional[str] = None) -> dict:
     """
     Use Google Gemini to evaluate whether the proof satisfies the task.
     For GitHub URLs: fetches real repo content first.
-    Returns: { score: float, verdict: "PASS"|"FAIL", reasoning: str, audit_report: str }
+    Returns: { score: float, verdict: "PASS"|"FAIL"|"DEFERRED", reasoning: str, audit_report: str }
+
+    DEFERRED means Gemini is degraded (breaker open or latency budget spent);
+    the result then carries `retry_after` seconds and the proof should be retried.
+
+    A rule-based pre-screen runs before Gemini; obvious FAILs (missing or empty
+    repo, URL not found or not public, repo created after `deadline`) never
+    reach the model.
+    The result's `prescreen` field records which rule fired and any flagged gaps.
     """
     if not GEMINI_API_KEY:
         return {
@@ -123,13 +746,32 @@ async def verify_proof(task_description: str, proof_url: str) -> dict:
         }
 
     try:
-        import httpx
-
         # If GitHub URL, fetch real repo content
         github_context = ""
         owner, repo = _parse_github_url(proof_url)
-        if owner and repo:
-            github_context = await _fetch_github_context(owner, repo)
+        with metrics.AI_VERIFY_PHASE_DURATION.time(phase="github" if owner and repo else "url_check"):
+            if owner and repo:
+                fetched = await _fetch_github_context(owner, repo)
+                screen = prescreen_github(fetched, deadline)
+            else:
+                fetched = None
+                screen = await prescreen_url(proof_url)
+
+        if screen["verdict"]:
+            print(f"🔎 verify_proof pre-screen: rule '{screen['rule']}' fired for {proof_url}")
+            return _prescreen_result(screen)
+
+        # Decided proofs are out of the way; now fail fast if Gemini is down
+        if _gemini_breaker.state == "OPEN":
+            return {
+                **_deferred_result("Gemini circuit breaker is open", _gemini_breaker.retry_after()),
+                "prescreen": screen,
+            }
+
+        if fetched is not None:
+            github_context = build_github_context(task_description, fetched)
+            if screen["flags"]:
+                github_context += "\n\nPRE-SCREEN FLAGS: " + ", ".join(screen["flags"])
 
         # Build prompt
         if github_context:
@@ -169,47 +811,42 @@ Respond in JSON format ONLY:
 A score >= 0.7 should be a PASS. Be fair but thorough.
 """
 
-        api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
+        prompt_chars = len(prompt)
+        prompt_tokens = _estimate_tokens(prompt)
+        started = time.perf_counter()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                api_url,
-                headers={"Content-Type": "application/json"},
-                json={
-                    "contents": [
-                        {
-                            "parts": [
-                                {"text": prompt}
-                            ]
-                        }
-                    ],
-                    "generationConfig": {
-                        "temperature": 0.3,
-                        "maxOutputTokens": 2000,
-                        "responseMimeType": "application/json",
-                    }
-                },
-                timeout=45.0
-            )
+        try:
+            with metrics.AI_VERIFY_PHASE_DURATION.time(phase="gemini"):
+                response = await _call_gemini(prompt)
+        except GeminiUnavailable as e:
+            print(f"⚠️  verify_proof deferred: {e} (breaker {_gemini_breaker.state})")
+            return {**_deferred_result(str(e), e.retry_after), "prescreen": screen}
 
-            if response.status_code == 200:
-                data = response.json()
-                content = data["candidates"][0]["content"]["parts"][0]["text"]
-                result = json.loads(content)
-                return {
-                    "score": float(result.get("score", 0)),
-                    "verdict": result.get("verdict", "FAIL"),
-                    "reasoning": result.get("reasoning", "No reasoning provided"),
-                    "audit_report": result.get("audit_report", "No audit report generated.")
-                }
-            else:
-                error_msg = response.text[:300]
-                return {
-                    "score": 0,
-                    "verdict": "FAIL",
-                    "reasoning": f"Gemini API error ({response.status_code}): {error_msg}",
-                    "audit_report": ""
-                }
+        latency_ms = (time.perf_counter() - started) * 1000
+        print(
+            f"🤖 verify_proof: prompt ~{prompt_tokens} tokens ({prompt_chars} chars), "
+            f"Gemini {response.status_code} in {latency_ms:.0f} ms"
+        )
+
+        if response.status_code == 200:
+            data = response.json()
+            content = data["candidates"][0]["content"]["parts"][0]["text"]
+            result = json.loads(content)
+            return {
+                "score": float(result.get("score", 0)),
+                "verdict": result.get("verdict", "FAIL"),
+                "reasoning": result.get("reasoning", "No reasoning provided"),
+                "audit_report": result.get("audit_report", "No audit report generated."),
+                "prescreen": screen,
+            }
+        else:
+            error_msg = response.text[:300]
+            return {
+                "score": 0,
+                "verdict": "FAIL",
+                "reasoning": f"Gemini API error ({response.status_code}): {error_msg}",
+                "audit_report": ""
+            }
 
     except json.JSONDecodeError as e:
         return {
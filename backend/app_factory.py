@@ -0,0 +1,267 @@
+"""
+Escrow App Factory
+Deploys one escrow application (contracts/escrow_contract.py) per task, in
+batches, and records each app ID on its task.
+
+New tasks are queued by POST /task/create and deployed in the background:
+up to APP_FACTORY_BATCH_SIZE queued tasks (the 16-transaction group limit)
+are created in one atomic group signed by the escrow account, then funded
+in a second group that pays each new app account its minimum balance. An
+app's ID and address only exist once its creation is confirmed, so creation
+and funding cannot share a group; app IDs are recorded on their tasks as
+soon as the create group confirms. Compiled programs come from the on-disk
+cache (contracts/artifacts.py) and are never recompiled per deploy.
+
+A failed create batch is queued again, and a failed funding group retried,
+after APP_FACTORY_RETRY_SECONDS doubling per attempt, up to
+APP_FACTORY_RETRIES attempts.
+
+Off by default: set ESCROW_APPS_ENABLED=true (needs ESCROW_MNEMONIC).
+"""
+
+import asyncio
+import os
+from typing import Optional
+from dotenv import load_dotenv
+
+import database as db
+import escrow
+import tracing
+
+load_dotenv()
+
+ESCROW_APPS_ENABLED = os.getenv("ESCROW_APPS_ENABLED", "false").lower() == "true"
+APP_FACTORY_BATCH_SIZE = min(int(os.getenv("APP_FACTORY_BATCH_SIZE", "16")), 16)
+APP_FACTORY_FLUSH_SECONDS = float(os.getenv("APP_FACTORY_FLUSH_SECONDS", "0.5"))
+APP_FACTORY_CONCURRENCY = int(os.getenv("APP_FACTORY_CONCURRENCY", "4"))
+APP_FACTORY_RETRIES = int(os.getenv("APP_FACTORY_RETRIES", "5"))
+APP_FACTORY_RETRY_SECONDS = float(os.getenv("APP_FACTORY_RETRY_SECONDS", "5"))
+
+# Minimum balance of an app account; it must hold this before it can send
+# the contract's inner payment transactions
+APP_MIN_BALANCE = 100_000  # microAlgos
+
+# Global state of the contract: amount, deadline / creator, worker, status
+GLOBAL_INTS = 2
+GLOBAL_BYTES = 3
+
+_queue: Optional[asyncio.Queue] = None  # (task_id, attempts)
+_worker: Optional[asyncio.Task] = None
+_jobs: set = set()  # in-flight _deploy/_fund jobs
+
+
+def enabled() -> bool:
+    """True when apps should be deployed: ESCROW_APPS_ENABLED and an escrow account."""
+    return ESCROW_APPS_ENABLED and escrow.get_escrow_address() is not None
+
+
+def enqueue(task: dict):
+    """Queue a task for app deployment (no-op unless the factory is running)."""
+    if _queue is not None:
+        _queue.put_nowait((task["id"], 0))
+
+
+# ─── Deployment ───────────────────────────────────────────────
+# Both steps are blocking (algod round trips and confirmation waits) and run
+# off the loop. Only algod is touched there — the caller records the app IDs
+# on the loop, so the task store and its change feed stay single-threaded.
+
+
+@tracing.traced("app_factory.create_apps")
+def create_apps(task_ids: list) -> dict:
+    """
+    Create one escrow app per task in a single atomic group.
+
+    Args:
+        task_ids: Up to APP_FACTORY_BATCH_SIZE task IDs without an app yet
+
+    Returns:
+        { task_id: app_id } for the apps created (not funded yet).
+
+    Raises:
+        algosdk errors if the group is rejected.
+    """
+    from algosdk import transaction
+    from contracts.artifacts import compiled_programs
+
+    if not task_ids:
+        return {}
+
+    client = escrow.get_algod_client()
+    private_key, escrow_addr = escrow.get_escrow_keys()
+    programs = compiled_programs(client)
+    params = client.suggested_params()
+
+    creates = [
+        transaction.ApplicationCreateTxn(
+            sender=escrow_addr,
+            sp=params,
+            on_complete=transaction.OnComplete.NoOpOC,
+            approval_program=programs["approval"],
+            clear_program=programs["clear"],
+            global_schema=transaction.StateSchema(GLOBAL_INTS, GLOBAL_BYTES),
+            local_schema=transaction.StateSchema(0, 0),
+            note=f"GigBounty task {task_id}".encode(),
+        )
+        for task_id in task_ids
+    ]
+    create_ids = _send_group(client, creates, private_key, "create")
+    app_ids = [client.pending_transaction_info(tx_id)["application-index"] for tx_id in create_ids]
+    return dict(zip(task_ids, app_ids))
+
+
+@tracing.traced("app_factory.fund_apps")
+def fund_apps(app_ids: list):
+    """
+    Pay each app account its minimum balance in one group.
+
+    Raises:
+        algosdk errors if the group is rejected.
+    """
+    from algosdk import transaction
+    from algosdk.logic import get_application_address
+
+    if not app_ids:
+        return
+
+    client = escrow.get_algod_client()
+    private_key, escrow_addr = escrow.get_escrow_keys()
+    params = client.suggested_params()
+    funds = [
+        transaction.PaymentTxn(
+            sender=escrow_addr,
+            sp=params,
+            receiver=get_application_address(app_id),
+            amt=APP_MIN_BALANCE,
+            note=b"GigBounty app funding",
+        )
+        for app_id in app_ids
+    ]
+    _send_group(client, funds, private_key, "fund")
+
+
+def _send_group(client, txns: list, private_key, stage: str) -> list:
+    """Group, sign, submit and confirm `txns`; returns their tx IDs in order."""
+    from algosdk import transaction
+
+    if len(txns) > 1:
+        txns = transaction.assign_group_id(txns)
+    signed = [txn.sign(private_key) for txn in txns]
+    with tracing.span(f"algod.send_group.{stage}", size=len(signed)):
+        client.send_transactions(signed)
+    tx_ids = [s.get_txid() for s in signed]
+    with tracing.span("algod.wait_for_confirmation", tx_id=tx_ids[0]):
+        transaction.wait_for_confirmation(client, tx_ids[0], 4)
+    return tx_ids
+
+
+# ─── Background Worker ────────────────────────────────────────
+
+
+async def _collect_batch() -> list:
+    """Wait for one queued task, then gather more for up to APP_FACTORY_FLUSH_SECONDS."""
+    loop = asyncio.get_running_loop()
+    batch = [await _queue.get()]
+    flush_at = loop.time() + APP_FACTORY_FLUSH_SECONDS
+    while len(batch) < APP_FACTORY_BATCH_SIZE:
+        remaining = flush_at - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(_queue.get(), timeout=remaining))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+def _backoff(attempts: int) -> float:
+    return APP_FACTORY_RETRY_SECONDS * 2 ** attempts
+
+
+async def _create(batch: list) -> dict:
+    """Create and record apps for a batch; failed tasks are queued again with backoff."""
+    pending = [(task_id, attempts) for task_id, attempts in batch
+               if (task := db.get_task(task_id)) and task.get("app_id") is None]
+    if not pending:
+        return {}
+    try:
+        created = await asyncio.to_thread(create_apps, [task_id for task_id, _ in pending])
+    except Exception as e:
+        print(f"⚠️  Escrow app creation failed for {len(pending)} task(s): {e}")
+        loop = asyncio.get_running_loop()
+        for task_id, attempts in pending:
+            if attempts + 1 < APP_FACTORY_RETRIES:
+                loop.call_later(_backoff(attempts), _requeue, task_id, attempts + 1)
+            else:
+                print(f"⚠️  Task {task_id} keeps no escrow app after {attempts + 1} attempt(s)")
+        return {}
+
+    # Recorded before funding, so a failed funding group never orphans an app
+    recorded = {
+        task_id: app_id for task_id, app_id in created.items()
+        if db.record_escrow_app(task_id, app_id) is not None
+    }
+    print(f"📜 Created {len(recorded)} escrow app(s): "
+          + ", ".join(f"{task_id}→{app_id}" for task_id, app_id in recorded.items()))
+    return recorded
+
+
+def _requeue(task_id: str, attempts: int):
+    if _queue is not None:
+        _queue.put_nowait((task_id, attempts))
+
+
+async def _deploy(batch: list, slots: asyncio.Semaphore):
+    try:
+        recorded = await _create(batch)
+    finally:
+        slots.release()
+    await _fund(list(recorded.values()))
+
+
+async def _fund(app_ids: list, attempts: int = 0):
+    """Fund new apps; a failed group is retried with backoff (the apps are already recorded)."""
+    if not app_ids:
+        return
+    try:
+        await asyncio.to_thread(fund_apps, app_ids)
+    except Exception as e:
+        if attempts + 1 >= APP_FACTORY_RETRIES:
+            print(f"⚠️  Funding escrow app(s) {app_ids} failed for good: {e}")
+            return
+        print(f"⚠️  Funding escrow app(s) {app_ids} failed ({e}) — retrying")
+        asyncio.get_running_loop().call_later(_backoff(attempts), lambda: _spawn(_fund(app_ids, attempts + 1)))
+
+
+def _spawn(coro):
+    job = asyncio.create_task(coro)
+    _jobs.add(job)
+    job.add_done_callback(_jobs.discard)
+
+
+async def _run():
+    slots = asyncio.Semaphore(APP_FACTORY_CONCURRENCY)
+    while True:
+        batch = await _collect_batch()
+        await slots.acquire()
+        _spawn(_deploy(batch, slots))
+
+
+def start():
+    """Start the deployment worker on the running loop (app startup)."""
+    global _queue, _worker
+    if not enabled() or _worker is not None:
+        return
+    _queue = asyncio.Queue()
+    _worker = asyncio.create_task(_run())
+    print(f"📜 Escrow app factory running (batches of {APP_FACTORY_BATCH_SIZE})")
+
+
+def stop():
+    """Stop the worker and cancel in-flight deploys (app shutdown); queued tasks keep no app."""
+    global _queue, _worker
+    for job in [_worker, *_jobs]:
+        if job is not None:
+            job.cancel()
+    _jobs.clear()
+    _queue = _worker = None
@@ -1,19 +1,198 @@
 """
 GigBounty — Wallet Authentication Module
-Verifies Algorand wallet ownership via Ed25519 signatures.
+Verifies Algorand wallet ownership via Ed25519 signatures over a
+server-issued, single-use nonce challenge. A successful login exchanges one
+signature for a short-lived HMAC-signed session token.
 In DEBUG_MODE, accepts wallet address without signature for local dev.
 """
 
 import os
+import re
+import hmac
+import time
 import base64
+import hashlib
+import secrets
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 from fastapi import Request, HTTPException
 from dotenv import load_dotenv
 
+import metrics
+import storage
+
 load_dotenv()
 
 DEBUG_MODE = os.getenv("DEBUG_MODE", "true").lower() == "true"
 
+# Challenge nonces: lifetime, max outstanding (in all, per wallet and per
+# client IP), and decoded-key cache size
+AUTH_NONCE_TTL = int(os.getenv("AUTH_NONCE_TTL", "300"))
+AUTH_NONCE_STORE_MAX = int(os.getenv("AUTH_NONCE_STORE_MAX", "10000"))
+AUTH_NONCES_PER_WALLET = int(os.getenv("AUTH_NONCES_PER_WALLET", "5"))
+AUTH_NONCES_PER_CLIENT = int(os.getenv("AUTH_NONCES_PER_CLIENT", "50"))
+VERIFY_KEY_CACHE_SIZE = int(os.getenv("VERIFY_KEY_CACHE_SIZE", "1024"))
+
+# Shared nonce table and session key when STORAGE_BACKEND=sqlite, so a
+# challenge issued by one worker process can be redeemed on another
+_store = storage.get_store()
+
+# Session tokens: HMAC-SHA256 key and lifetime. Without JWT_SECRET a random
+# key is used (per process, or shared via the SQLite store), so tokens don't
+# survive a restart in JSON mode.
+SESSION_SECRET = (
+    os.getenv("JWT_SECRET", "")
+    or (_store.get_or_create_secret("session_secret", lambda: secrets.token_hex(32)) if _store else "")
+    or secrets.token_hex(32)
+).encode()
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))
+
+# Shared secret for the /admin endpoints (X-Admin-Token); empty disables them
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
+
+# { nonce: (wallet_address, expires_at, client) } — fixed TTL, so insertion order is expiry order
+_nonces: OrderedDict = OrderedDict()
+# Outstanding nonces per wallet and per client IP, oldest first: { key: [nonce, ...] }
+_wallet_nonces: dict = {}
+_client_nonces: dict = {}
+
+_NONCE_RE = re.compile(r"Nonce: ([A-Za-z0-9_-]{16,})")
+
+
+# ─── Challenge Nonces ─────────────────────────────────────────
+
+
+def _unlist(index: dict, key: str, nonce: str):
+    pending = index.get(key, [])
+    if nonce in pending:
+        pending.remove(nonce)
+    if not pending:
+        index.pop(key, None)
+
+
+def _drop_nonce(nonce: str):
+    entry = _nonces.pop(nonce, None)
+    if entry is not None:
+        _unlist(_wallet_nonces, entry[0], nonce)
+        _unlist(_client_nonces, entry[2], nonce)
+
+
+def _purge_expired_nonces(now: float):
+    """Drop expired nonces from the front of the store."""
+    while _nonces:
+        nonce, (_, expires_at, _) = next(iter(_nonces.items()))
+        if expires_at > now:
+            break
+        _drop_nonce(nonce)
+
+
+def _trim_nonces(index: dict, key: str, limit: int):
+    """Drop the oldest nonces of one wallet or client beyond `limit`."""
+    pending = index.get(key, [])
+    while len(pending) > max(limit, 1):
+        _drop_nonce(pending[0])
+
+
+def issue_challenge(wallet_address: str, client: str = "") -> dict:
+    """
+    Issue a single-use nonce for a wallet to sign.
+
+    Outstanding nonces are capped per wallet (AUTH_NONCES_PER_WALLET) and per
+    client IP (AUTH_NONCES_PER_CLIENT); going over a cap drops that wallet's
+    or client's own oldest nonce. Should AUTH_NONCE_STORE_MAX still be
+    reached, the oldest nonce of the client holding the most is dropped, so
+    a flood of challenges for made-up wallets only evicts the flooder's.
+
+    Args:
+        wallet_address: Wallet the nonce is issued to
+        client: Requesting client's IP address
+
+    Returns:
+        { nonce, message, expires_at } — the wallet signs `message` verbatim
+        and sends it back in X-Wallet-Message.
+    """
+    now = time.time()
+    nonce = secrets.token_urlsafe(24)
+    expires_at = now + AUTH_NONCE_TTL
+    if _store is not None:
+        _store.put_nonce(
+            nonce, wallet_address, client, expires_at,
+            AUTH_NONCES_PER_WALLET, AUTH_NONCES_PER_CLIENT, AUTH_NONCE_STORE_MAX,
+        )
+    else:
+        _purge_expired_nonces(now)
+        _nonces[nonce] = (wallet_address, expires_at, client)
+        _wallet_nonces.setdefault(wallet_address, []).append(nonce)
+        _client_nonces.setdefault(client, []).append(nonce)
+        _trim_nonces(_wallet_nonces, wallet_address, AUTH_NONCES_PER_WALLET)
+        _trim_nonces(_client_nonces, client, AUTH_NONCES_PER_CLIENT)
+        while len(_nonces) > AUTH_NONCE_STORE_MAX:
+            _drop_nonce(max(_client_nonces.values(), key=len)[0])
+
+    expires_iso = datetime.fromtimestamp(expires_at, timezone.utc).isoformat()
+    return {
+        "nonce": nonce,
+        # Single line — it travels back in the X-Wallet-Message header
+        "message": f"GigBounty login | Wallet: {wallet_address} | Nonce: {nonce} | Expires: {expires_iso}",
+        "expires_at": expires_iso,
+    }
+
+
+def _nonce_from_message(message: str) -> Optional[str]:
+    match = _NONCE_RE.search(message)
+    return match.group(1) if match else None
+
+
+def _nonce_is_valid(nonce: str, wallet_address: str) -> bool:
+    """True if the nonce was issued to this wallet and hasn't expired or been used."""
+    entry = _store.get_nonce(nonce) if _store is not None else _nonces.get(nonce)
+    return entry is not None and entry[0] == wallet_address and entry[1] > time.time()
+
+
+# ─── Signature Verification ───────────────────────────────────
+
+
+@lru_cache(maxsize=1)
+def _crypto():
+    """Import algosdk/nacl once, on first use."""
+    from algosdk import encoding
+    from nacl.signing import VerifyKey
+    from nacl.exceptions import BadSignatureError
+    return encoding, VerifyKey, BadSignatureError
+
+
+def warm_up():
+    """Import the signature libraries ahead of the first signed request."""
+    _crypto()
+
+
+@lru_cache(maxsize=VERIFY_KEY_CACHE_SIZE)
+def _verify_key(wallet_address: str):
+    """Decoded Ed25519 verify key for an Algorand address (bounded LRU cache)."""
+    encoding, VerifyKey, _ = _crypto()
+    # Decode the Algorand address to get the raw 32-byte public key
+    return VerifyKey(encoding.decode_address(wallet_address))
+
+
+def _collect_cache_metrics():
+    info = _verify_key.cache_info()
+    metrics.CACHE_REQUESTS.set_total(info.hits, cache="verify_key", result="hit")
+    metrics.CACHE_REQUESTS.set_total(info.misses, cache="verify_key", result="miss")
+
+
+metrics.register_collector(_collect_cache_metrics)
+
+
+def is_valid_wallet_address(wallet_address: str) -> bool:
+    """True if the string decodes as an Algorand address (also warms the key cache)."""
+    try:
+        _verify_key(wallet_address)
+        return True
+    except Exception:
+        return False
+
 
 def verify_wallet_signature(wallet_address: str, signature_b64: str, message: str) -> bool:
     """
@@ -28,12 +207,7 @@ def verify_wallet_signature(wallet_address: str, signature_b64: str, message: st
         True if the signature is valid for this wallet, False otherwise.
     """
     try:
-        from algosdk import encoding
-        from nacl.signing import VerifyKey
-        from nacl.exceptions import BadSignatureError
-
-        # Decode the Algorand address to get the raw 32-byte public key
-        public_key_bytes = encoding.decode_address(wallet_address)
+        verify_key = _verify_key(wallet_address)
 
         # Decode the signature from base64
         signature_bytes = base64.b64decode(signature_b64)
@@ -43,24 +217,108 @@ def verify_wallet_signature(wallet_address: str, signature_b64: str, message: st
         prefixed_message = b"MX" + message.encode("utf-8")
 
         # Verify using Ed25519
-        verify_key = VerifyKey(public_key_bytes)
         verify_key.verify(prefixed_message, signature_bytes)
 
         return True
 
-    except (BadSignatureError, Exception) as e:
+    except Exception as e:
         print(f"⚠️  Signature verification failed: {e}")
         return False
 
 
+# ─── Session Tokens ───────────────────────────────────────────
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _session_mac(payload: str) -> str:
+    return _b64url(hmac.new(SESSION_SECRET, payload.encode(), hashlib.sha256).digest())
+
+
+def issue_session_token(wallet_address: str) -> dict:
+    """
+    Issue a session token bound to a wallet: "<wallet>.<expiry>.<hmac>".
+
+    Returns:
+        { token, wallet_address, expires_at }
+    """
+    expires_at = int(time.time()) + SESSION_TTL
+    payload = f"{wallet_address}.{expires_at}"
+    return {
+        "token": f"{payload}.{_session_mac(payload)}",
+        "wallet_address": wallet_address,
+        "expires_at": datetime.fromtimestamp(expires_at, timezone.utc).isoformat(),
+    }
+
+
+def verify_session_token(token: str) -> Optional[str]:
+    """Return the wallet a session token is bound to, or None if invalid/expired."""
+    try:
+        wallet_address, expires_at, mac = token.split(".")
+        expiry = int(expires_at)
+    except ValueError:
+        return None
+    if not hmac.compare_digest(mac, _session_mac(f"{wallet_address}.{expires_at}")):
+        return None
+    if expiry < time.time():
+        return None
+    return wallet_address
+
+
+# ─── Request Authentication ───────────────────────────────────
+
+
+def verify_signed_challenge(wallet_address: str, signature: str, message: str):
+    """
+    Check a signature over an outstanding challenge nonce and consume the nonce.
+
+    Raises:
+        HTTPException 401 if the nonce or signature is invalid.
+    """
+    if not signature or not message:
+        raise HTTPException(
+            status_code=401,
+            detail="Missing X-Wallet-Signature or X-Wallet-Message header"
+        )
+
+    # The message must carry an outstanding nonce issued to this wallet
+    nonce = _nonce_from_message(message)
+    if not nonce or not _nonce_is_valid(nonce, wallet_address):
+        raise HTTPException(
+            status_code=401,
+            detail="Missing, expired or already-used nonce — request a new one from /auth/challenge"
+        )
+
+    if not verify_wallet_signature(wallet_address, signature, message):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid wallet signature"
+        )
+
+    # Single use: a replayed message fails the nonce check above. The shared
+    # store's delete is atomic, so only one worker can redeem a nonce.
+    if _store is not None:
+        if not _store.consume_nonce(nonce):
+            raise HTTPException(
+                status_code=401,
+                detail="Missing, expired or already-used nonce — request a new one from /auth/challenge"
+            )
+    else:
+        _drop_nonce(nonce)
+
+
 async def get_authenticated_wallet(request: Request) -> Optional[str]:
     """
     FastAPI dependency that extracts and verifies wallet identity from headers.
 
-    Expected headers:
+    Accepted credentials (either):
+        Authorization: Bearer <session token from POST /auth/login>
+    or
         X-Wallet-Address: The caller's Algorand wallet address
         X-Wallet-Signature: Base64 Ed25519 signature of a challenge message
-        X-Wallet-Message: The message that was signed (e.g., timestamp-based nonce)
+        X-Wallet-Message: The challenge message from GET /auth/challenge
 
     In DEBUG_MODE=true, only the address header is required (no signature check).
 
@@ -72,6 +330,16 @@ async def get_authenticated_wallet(request: Request) -> Optional[str]:
     """
     wallet_address = request.headers.get("X-Wallet-Address", "").strip()
 
+    # ─── Session token: HMAC check only, no signature crypto ──
+    authorization = request.headers.get("Authorization", "")
+    if authorization.startswith("Bearer "):
+        token_wallet = verify_session_token(authorization[7:].strip())
+        if token_wallet is None:
+            raise HTTPException(status_code=401, detail="Invalid or expired session token")
+        if wallet_address and wallet_address != token_wallet:
+            raise HTTPException(status_code=401, detail="Session token does not match X-Wallet-Address")
+        return token_wallet
+
     if not wallet_address:
         if DEBUG_MODE:
             # In debug mode, allow unauthenticated requests (backward compat)
@@ -86,21 +354,11 @@ async def get_authenticated_wallet(request: Request) -> Optional[str]:
         return wallet_address
 
     # ─── Production: require signature ────────────────────────
-    signature = request.headers.get("X-Wallet-Signature", "").strip()
-    message = request.headers.get("X-Wallet-Message", "").strip()
-
-    if not signature or not message:
-        raise HTTPException(
-            status_code=401,
-            detail="Missing X-Wallet-Signature or X-Wallet-Message header"
-        )
-
-    if not verify_wallet_signature(wallet_address, signature, message):
-        raise HTTPException(
-            status_code=401,
-            detail="Invalid wallet signature"
-        )
-
+    verify_signed_challenge(
+        wallet_address,
+        request.headers.get("X-Wallet-Signature", "").strip(),
+        request.headers.get("X-Wallet-Message", "").strip(),
+    )
     return wallet_address
 
 
@@ -128,3 +386,16 @@ def require_wallet_ownership(authenticated_wallet: Optional[str], expected_walle
             status_code=403,
             detail="You do not own this resource"
         )
+
+
+def require_admin(request: Request):
+    """
+    Assert that the request carries X-Admin-Token: <ADMIN_API_TOKEN>
+    (constant-time; never passes without ADMIN_API_TOKEN).
+
+    Raises:
+        HTTPException 403 otherwise.
+    """
+    token = request.headers.get("X-Admin-Token", "")
+    if not (ADMIN_API_TOKEN and hmac.compare_digest(token.encode(), ADMIN_API_TOKEN.encode())):
+        raise HTTPException(status_code=403, detail="Admin token required")
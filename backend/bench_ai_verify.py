@@ -0,0 +1,156 @@
+"""
+GigBounty — AI Verification Pipeline Benchmark
+
+Drives N concurrent verify_proof() calls against the offline fake GitHub +
+Gemini server (fake_services.py) and reports latency percentiles and
+throughput. No network access or real GEMINI_API_KEY is needed.
+
+USAGE:
+  python bench_ai_verify.py --calls 500 --concurrency 50 --latency-ms 40
+  python bench_ai_verify.py --calls 200 --error-rate 0.1 --json
+
+By default the fake server is started in-process on a free port. Pass
+--target http://host:port to benchmark an already running fake server.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+# Proof URLs cycled through by the benchmark (see CANNED_REPOS in fake_services.py)
+PROOF_URLS = [
+    "https://github.com/fake/todo-app",
+    "https://github.com/fake/flask-api",
+    "https://github.com/fake/readme-only",
+    "https://github.com/fake/empty-repo",
+    "https://github.com/fake/does-not-exist",
+]
+TASK_DESCRIPTION = "Build a flat design todo app in React with filtering and local storage."
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_fake_server(args) -> str:
+    """Run fake_services in a daemon thread; returns its base URL."""
+    import uvicorn
+    from fake_services import create_app
+
+    port = _free_port()
+    app = create_app(args.latency_ms, args.error_rate, args.rate_limit, args.seed)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("fake server did not start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+async def _run(args) -> dict:
+    import ai_verify
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    verdicts = {}
+    rules = {}
+
+    async def one(i: int):
+        async with semaphore:
+            url = PROOF_URLS[i % len(PROOF_URLS)]
+            started = time.perf_counter()
+            result = await ai_verify.verify_proof(TASK_DESCRIPTION, url, "2026-12-31")
+            latencies.append((time.perf_counter() - started) * 1000)
+            verdicts[result["verdict"]] = verdicts.get(result["verdict"], 0) + 1
+            rule = (result.get("prescreen") or {}).get("rule")
+            if rule:
+                rules[rule] = rules.get(rule, 0) + 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.calls)))
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "calls": args.calls,
+        "concurrency": args.concurrency,
+        "injected_latency_ms": args.latency_ms,
+        "injected_error_rate": args.error_rate,
+        "wall_seconds": round(wall, 3),
+        "calls_per_second": round(args.calls / wall, 2) if wall else 0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+            "mean": round(statistics.fmean(latencies), 2) if latencies else 0,
+            "max": round(latencies[-1], 2) if latencies else 0,
+        },
+        "verdicts": verdicts,
+        "prescreen_rules": rules,
+        "breaker_state": ai_verify._gemini_breaker.state,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark verify_proof against fake external APIs")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", action="store_true", help="inject 429s instead of 503s")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-cache", action="store_true", help="revalidate GitHub responses on every call")
+    parser.add_argument("--target", help="URL of an already running fake_services.py")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON only")
+    args = parser.parse_args()
+
+    base = args.target.rstrip("/") if args.target else _start_fake_server(args)
+
+    # ai_verify reads its configuration at import time
+    os.environ["GITHUB_API_URL"] = base
+    os.environ["GEMINI_API_BASE"] = f"{base}/v1beta"
+    os.environ["GEMINI_API_KEY"] = "fake-key"
+    if args.no_cache:
+        os.environ["GITHUB_CACHE_TTL"] = "0"
+
+    report = asyncio.run(_run(args))
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+
+    lat = report["latency_ms"]
+    print("=" * 60)
+    print("  GigBounty — verify_proof Benchmark (offline)")
+    print("=" * 60)
+    print(f"  Calls:        {report['calls']} (concurrency {report['concurrency']})")
+    print(f"  Injected:     {args.latency_ms} ms latency, {args.error_rate:.0%} errors")
+    print(f"  Throughput:   {report['calls_per_second']} calls/s over {report['wall_seconds']} s")
+    print(f"  Latency:      p50 {lat['p50']} ms | p95 {lat['p95']} ms | p99 {lat['p99']} ms | max {lat['max']} ms")
+    print(f"  Verdicts:     {report['verdicts']}")
+    print(f"  Pre-screen:   {report['prescreen_rules']}")
+    print(f"  Breaker:      {report['breaker_state']}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+GigBounty — End-to-End API Load Harness
+
+Drives the FastAPI app with a realistic mix and then checks invariants:
+  - readers polling GET /tasks (summary and full), /tasks/{id} and /tasks/changes
+  - concurrent create → claim → submit-proof → approve lifecycles across a
+    pool of simulated wallets, with several workers racing to claim each
+    task and the creator sending duplicate approvals
+
+Runs in DEBUG_MODE demo escrow (no mnemonic, no Gemini key), so no network
+access is needed. Reports throughput and latency percentiles per endpoint,
+then verifies that no task was claimed twice, no task was paid out twice
+and no request failed with a 5xx. Exits non-zero if an invariant fails.
+
+USAGE:
+  python bench_api_load.py --lifecycles 500 --wallets 300 --readers 40
+  python bench_api_load.py --backend sqlite --json
+  python bench_api_load.py --target http://127.0.0.1:8000   # running server
+
+By default the app runs in-process (httpx ASGI transport) against a
+temporary task file. A --target server must itself run with DEBUG_MODE=true
+and no ESCROW_MNEMONIC.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def _wallet(i: int, prefix: str) -> str:
+    """Deterministic 58-char pseudo address (DEBUG_MODE auth only checks the header)."""
+    return (prefix + str(i).rjust(57 - len(prefix), "0") + "A")[:58]
+
+
+def _in_process_client(args) -> httpx.AsyncClient:
+    """Import main.py against a temporary board in demo escrow mode."""
+    workdir = tempfile.mkdtemp(prefix="gigbounty-load-")
+    os.environ["DEBUG_MODE"] = "true"
+    os.environ["ESCROW_MNEMONIC"] = ""
+    os.environ["GEMINI_API_KEY"] = ""
+    os.environ["STORAGE_BACKEND"] = args.backend
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+
+    import database as db
+    import escrow
+    import main
+
+    db.DB_FILE = os.path.join(workdir, "tasks_db.json")
+    with open(db.DB_FILE, "w") as f:
+        f.write("[]")
+    escrow.USED_TX_FILE = os.path.join(workdir, "used_tx_ids.json")
+    # The ASGI transport doesn't run the app's lifespan, so do its warm-up loads here
+    db.load()
+    escrow.warm_up()
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://gigbounty", timeout=60)
+
+
+class Recorder:
+    """Per-endpoint latencies and status codes."""
+
+    def __init__(self):
+        self.latencies: dict = {}  # { endpoint: [ms] }
+        self.statuses: dict = {}   # { endpoint: { status: count } }
+
+    async def call(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+            status = resp.status_code
+        except httpx.HTTPError:
+            resp, status = None, "error"
+        self.latencies.setdefault(endpoint, []).append((time.perf_counter() - started) * 1000)
+        counts = self.statuses.setdefault(endpoint, {})
+        counts[status] = counts.get(status, 0) + 1
+        return resp
+
+    def report(self, wall: float) -> dict:
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            latencies.sort()
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "requests_per_second": round(len(latencies) / wall, 2) if wall else 0,
+                "statuses": {str(k): v for k, v in sorted(self.statuses[endpoint].items(), key=str)},
+                "latency_ms": {
+                    "p50": round(_percentile(latencies, 50), 2),
+                    "p95": round(_percentile(latencies, 95), 2),
+                    "p99": round(_percentile(latencies, 99), 2),
+                    "mean": round(statistics.fmean(latencies), 2),
+                    "max": round(latencies[-1], 2),
+                },
+            }
+        return endpoints
+
+
+async def _run(args) -> dict:
+    client = (
+        httpx.AsyncClient(base_url=args.target.rstrip("/"), timeout=60)
+        if args.target else _in_process_client(args)
+    )
+    rng = random.Random(args.seed)
+    rec = Recorder()
+    creators = [_wallet(i, "CREATOR") for i in range(args.wallets)]
+    workers = [_wallet(i, "WORKER") for i in range(args.wallets)]
+
+    claims: dict = {}    # { task_id: [worker_wallet of each 200 claim] }
+    payouts: dict = {}   # { task_id: number of 200 approvals }
+    created: dict = {}   # { task_id: creator_wallet }
+    done = asyncio.Event()
+    lifecycle_slots = asyncio.Semaphore(args.concurrency)
+
+    async def lifecycle(i: int):
+        async with lifecycle_slots:
+            creator = rng.choice(creators)
+            resp = await rec.call(client, "POST /task/create", "POST", "/task/create", json={
+                "title": f"Load task {i}",
+                "description": "Synthetic load-test task. " * rng.randint(1, 40),
+                "amount": round(rng.uniform(1, 100), 2),
+                "creator_wallet": creator,
+                "deadline": "2030-01-01",
+            }, headers={"X-Wallet-Address": creator})
+            if resp is None or resp.status_code != 200:
+                return
+            task_id = resp.json()["id"]
+            created[task_id] = creator
+            claims[task_id] = []
+            payouts[task_id] = 0
+
+            # Several workers race for the same task; exactly one may win
+            racers = rng.sample(workers, args.claim_race)
+
+            async def claim(worker):
+                r = await rec.call(client, "POST /task/claim", "POST", "/task/claim",
+                                   json={"task_id": task_id, "worker_wallet": worker},
+                                   headers={"X-Wallet-Address": worker})
+                if r is not None and r.status_code == 200:
+                    claims[task_id].append(worker)
+
+            await asyncio.gather(*(claim(w) for w in racers))
+            if not claims[task_id]:
+                return
+            winner = claims[task_id][0]
+
+            resp = await rec.call(client, "POST /task/submit-proof", "POST", "/task/submit-proof",
+                                  json={"task_id": task_id, "proof_url": f"https://example.com/proof/{task_id}"},
+                                  headers={"X-Wallet-Address": winner})
+            if resp is None or resp.status_code != 200:
+                return
+
+            # Duplicate approvals (double click, retries) must pay out once
+            async def approve():
+                r = await rec.call(client, "POST /task/approve", "POST", "/task/approve",
+                                   json={"task_id": task_id}, headers={"X-Wallet-Address": creator})
+                if r is not None and r.status_code == 200:
+                    payouts[task_id] += 1
+
+            await asyncio.gather(*(approve() for _ in range(args.approve_race)))
+
+    async def reader():
+        version = 0
+        while not done.is_set():
+            roll = rng.random()
+            if roll < 0.5:
+                await rec.call(client, "GET /tasks?view=summary", "GET", "/tasks", params={"view": "summary"})
+            elif roll < 0.65:
+                await rec.call(client, "GET /tasks", "GET", "/tasks")
+            elif roll < 0.85 and created:
+                task_id = rng.choice(list(created))
+                await rec.call(client, "GET /tasks/{id}", "GET", f"/tasks/{task_id}")
+            else:
+                resp = await rec.call(client, "GET /tasks/changes", "GET", "/tasks/changes", params={"since": version})
+                if resp is not None and resp.status_code == 200:
+                    version = resp.json()["version"]
+            await asyncio.sleep(args.poll_interval)
+
+    wall_start = time.perf_counter()
+    readers = [asyncio.create_task(reader()) for _ in range(args.readers)]
+    await asyncio.gather(*(lifecycle(i) for i in range(args.lifecycles)))
+    done.set()
+    await asyncio.gather(*readers)
+    wall = time.perf_counter() - wall_start
+
+    # ─── Invariants ───────────────────────────────────────────
+    final = {t["id"]: t for t in (await client.get("/tasks")).json() if t["id"] in created}
+    await client.aclose()
+
+    violations = []
+    for task_id, winners in claims.items():
+        if len(winners) > 1:
+            violations.append(f"task {task_id} claimed {len(winners)} times: {winners}")
+        task = final.get(task_id)
+        if task is None:
+            violations.append(f"task {task_id} missing from GET /tasks")
+            continue
+        if winners and task["worker_wallet"] != winners[0]:
+            violations.append(f"task {task_id} worker {task['worker_wallet']} != claim winner {winners[0]}")
+        if payouts[task_id] > 1:
+            violations.append(f"task {task_id} paid out {payouts[task_id]} times")
+        if (task["status"] == "COMPLETED") != (payouts[task_id] == 1):
+            violations.append(f"task {task_id} status {task['status']} after {payouts[task_id]} payouts")
+    for endpoint, counts in rec.statuses.items():
+        failures = sum(n for status, n in counts.items() if status == "error" or status >= 500)
+        if failures:
+            violations.append(f"{endpoint}: {failures} request(s) failed with 5xx or transport errors")
+
+    endpoints = rec.report(wall)
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "mode": "target" if args.target else "in-process",
+        "backend": None if args.target else args.backend,
+        "lifecycles": args.lifecycles,
+        "wallets": args.wallets,
+        "readers": args.readers,
+        "wall_seconds": round(wall, 3),
+        "requests": total,
+        "requests_per_second": round(total / wall, 2) if wall else 0,
+        "tasks": {
+            "created": len(created),
+            "completed": sum(1 for t in final.values() if t["status"] == "COMPLETED"),
+        },
+        "endpoints": endpoints,
+        "invariants": {"ok": not violations, "violations": violations[:50]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent end-to-end load test of the GigBounty API")
+    parser.add_argument("--lifecycles", type=int, default=300, help="create→claim→submit→approve flows")
+    parser.add_argument("--concurrency", type=int, default=50, help="lifecycles in flight at once")
+    parser.add_argument("--wallets", type=int, default=200, help="simulated creator and worker wallets (each)")
+    parser.add_argument("--readers", type=int, default=30, help="concurrent polling clients")
+    parser.add_argument("--poll-interval", type=float, default=0.01, help="reader pause between requests (s)")
+    parser.add_argument("--claim-race", type=int, default=3, help="workers racing to claim each task")
+    parser.add_argument("--approve-race", type=int, default=2, help="concurrent approvals per task")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json", help="in-process storage backend")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--target", help="base URL of a running server instead of in-process")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON only")
+    args = parser.parse_args()
+    args.claim_race = min(args.claim_race, args.wallets)
+
+    report = asyncio.run(_run(args))
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print("=" * 78)
+        print("  GigBounty — API Load Harness")
+        print("=" * 78)
+        print(f"  Mode:         {report['mode']} ({report['backend'] or 'remote'})")
+        print(f"  Workload:     {args.lifecycles} lifecycles x {args.claim_race} claimers, "
+              f"{args.readers} readers, {args.wallets} wallets")
+        print(f"  Throughput:   {report['requests_per_second']} req/s "
+              f"({report['requests']} requests in {report['wall_seconds']} s)")
+        print(f"  Tasks:        {report['tasks']['created']} created, {report['tasks']['completed']} completed")
+        for endpoint, e in report["endpoints"].items():
+            lat = e["latency_ms"]
+            print(f"    {endpoint:<26} {e['requests']:>6} req  p50 {lat['p50']:>8.2f} ms  "
+                  f"p95 {lat['p95']:>8.2f} ms  p99 {lat['p99']:>8.2f} ms  {e['statuses']}")
+        inv = report["invariants"]
+        print(f"  Invariants:   {'OK' if inv['ok'] else 'FAILED'}")
+        for violation in inv["violations"]:
+            print(f"    ✗ {violation}")
+        print("=" * 78)
+
+    sys.exit(0 if report["invariants"]["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
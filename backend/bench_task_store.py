@@ -0,0 +1,243 @@
+"""
+GigBounty — Task Store Benchmark
+
+Generates synthetic boards of increasing size and measures database.py:
+create_task, update_task, get_task, get_all_tasks, get_all_tasks_json and
+_load_db latency percentiles and throughput, plus resident memory and
+on-disk size. Results are machine-readable JSON, so storage changes can be
+compared run to run.
+
+USAGE:
+  python bench_task_store.py                          # 1k, 10k, 100k, 1M tasks
+  python bench_task_store.py --sizes 1000,10000 --json > before.json
+  python bench_task_store.py --backend sqlite --write-ops 200
+
+Each board size runs in a fresh subprocess so RSS reflects that size only.
+Boards are written to a temporary directory; the real tasks_db.json and
+gigbounty.db are never touched. Every JSON-mode write rewrites the whole
+file, so keep --write-ops small for the 1M board.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+DEFAULT_SIZES = "1000,10000,100000,1000000"
+STATUSES = ["OPEN"] * 5 + ["CLAIMED", "SUBMITTED", "COMPLETED", "COMPLETED", "CANCELLED", "DISPUTED"]
+WORDS = (
+    "build react api python smart contract algorand wallet design landing page "
+    "fix bug write tests docs deploy docker mobile app dashboard chart data "
+    "scraper bot discord telegram logo figma audit security review backend"
+).split()
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def _rss_mb() -> float:
+    """Current resident set size (Linux /proc), falling back to the peak."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError):
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def _synthetic_task(rng: random.Random, created: datetime) -> dict:
+    status = rng.choice(STATUSES)
+    title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))).capitalize()
+    description = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 300)))
+    worker = None if status == "OPEN" else "W" + uuid.UUID(int=rng.getrandbits(128)).hex.upper()[:57]
+    return {
+        "id": uuid.UUID(int=rng.getrandbits(128)).hex[:8],
+        "title": title,
+        "description": description,
+        "amount": round(rng.uniform(0.5, 500), 2),
+        "creator_wallet": "C" + uuid.UUID(int=rng.getrandbits(128)).hex.upper()[:57],
+        "worker_wallet": worker,
+        "status": status,
+        "proof_url": "https://github.com/example/repo" if status in ("SUBMITTED", "COMPLETED") else None,
+        "created_at": created.isoformat(),
+        "deadline": (created + timedelta(days=rng.randint(1, 60))).strftime("%Y-%m-%d") if rng.random() < 0.8 else None,
+        "tx_id": "TX" + uuid.UUID(int=rng.getrandbits(128)).hex.upper()[:50],
+        "version": 1,
+    }
+
+
+def _timed(fn, repeats: int) -> dict:
+    """Run fn `repeats` times; latency percentiles (ms) and throughput."""
+    latencies = []
+    wall_start = time.perf_counter()
+    for i in range(repeats):
+        started = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - started) * 1000)
+    wall = time.perf_counter() - wall_start
+    latencies.sort()
+    return {
+        "ops": repeats,
+        "ops_per_second": round(repeats / wall, 2) if wall else 0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 4),
+            "p95": round(_percentile(latencies, 95), 4),
+            "p99": round(_percentile(latencies, 99), 4),
+            "mean": round(statistics.fmean(latencies), 4) if latencies else 0,
+            "max": round(latencies[-1], 4) if latencies else 0,
+        },
+    }
+
+
+def _disk_bytes(paths: list) -> int:
+    return sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+
+
+def run_size(args) -> dict:
+    """Benchmark one board size in this process (see --worker)."""
+    workdir = tempfile.mkdtemp(prefix="gigbounty-bench-")
+    db_file = os.path.join(workdir, "tasks_db.json")
+    sqlite_file = os.path.join(workdir, "bench.db")
+
+    # database.py reads its configuration (and opens the SQLite store) at
+    # import time; point it at a throwaway store, then swap in the benchmark's own
+    os.environ["STORAGE_BACKEND"] = args.backend
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'import.db')}"
+    import database as db
+    import storage
+    db.DB_FILE = db_file
+    if db._store is not None:
+        db._store = storage.SQLiteStore(sqlite_file)
+
+    rng = random.Random(args.seed)
+    started = datetime(2025, 1, 1)
+    gen_start = time.perf_counter()
+    tasks = [_synthetic_task(rng, started + timedelta(seconds=i * 30)) for i in range(args.size)]
+    if db._store is not None:
+        db._store.import_tasks(tasks)
+    else:
+        with open(db_file, "w") as f:
+            json.dump(tasks, f, indent=2, default=str)
+    generate_seconds = time.perf_counter() - gen_start
+    ids = [t["id"] for t in tasks]
+    del tasks
+
+    rss_before_load = _rss_mb()
+    results = {"_load_db": _timed(lambda i: db._load_db(), args.load_repeats)}
+    db._loaded = True  # keep the first timed read from loading the board again
+    rss_loaded = _rss_mb()
+
+    results["get_task"] = _timed(lambda i: db.get_task(ids[rng.randrange(len(ids))]), args.read_ops)
+    results["get_all_tasks"] = _timed(lambda i: db.get_all_tasks(), args.list_ops)
+    db._invalidate()
+    results["get_all_tasks_json_cold"] = _timed(lambda i: (db._invalidate(), db.get_all_tasks_json()), args.list_ops)
+    results["get_all_tasks_json_cached"] = _timed(lambda i: db.get_all_tasks_json(), args.read_ops)
+    results["update_task"] = _timed(
+        lambda i: db.update_task(ids[rng.randrange(len(ids))], {"amount": round(rng.uniform(1, 500), 2)}),
+        args.write_ops,
+    )
+    results["create_task"] = _timed(
+        lambda i: db.create_task(f"Bench task {i}", "Synthetic benchmark task " * 20, 10.0, "C" * 58, "2026-12-31"),
+        args.write_ops,
+    )
+
+    disk = _disk_bytes([db_file] if db._store is None else [sqlite_file, sqlite_file + "-wal"])
+    for path in os.listdir(workdir):
+        os.remove(os.path.join(workdir, path))
+    os.rmdir(workdir)
+
+    return {
+        "size": args.size,
+        "backend": args.backend,
+        "generate_seconds": round(generate_seconds, 3),
+        "rss_mb": {"before_load": rss_before_load, "loaded": rss_loaded, "peak": _peak_rss_mb()},
+        "disk_bytes": disk,
+        "operations": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark database.py at production-scale board sizes")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated board sizes")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--read-ops", type=int, default=2000, help="get_task / cached list calls per size")
+    parser.add_argument("--list-ops", type=int, default=5, help="uncached full-board calls per size")
+    parser.add_argument("--write-ops", type=int, default=20, help="create_task / update_task calls per size")
+    parser.add_argument("--load-repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON only")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        json.dump(run_size(args), sys.stdout)
+        return
+
+    report = {
+        "benchmark": "task_store",
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "backend": args.backend,
+        "settings": {k: getattr(args, k) for k in ("read_ops", "list_ops", "write_ops", "load_repeats", "seed")},
+        "results": [],
+    }
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        if not args.json:
+            print(f"… benchmarking {size:,} tasks", file=sys.stderr)
+        cmd = [
+            sys.executable, os.path.abspath(__file__), "--worker", "--size", str(size),
+            "--backend", args.backend, "--read-ops", str(args.read_ops), "--list-ops", str(args.list_ops),
+            "--write-ops", str(args.write_ops), "--load-repeats", str(args.load_repeats), "--seed", str(args.seed),
+        ]
+        proc = subprocess.run(cmd, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if proc.returncode != 0:
+            report["results"].append({"size": size, "error": proc.stderr.strip()[-2000:]})
+            continue
+        report["results"].append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+
+    print("=" * 78)
+    print(f"  GigBounty — Task Store Benchmark ({args.backend})")
+    print("=" * 78)
+    for result in report["results"]:
+        if "error" in result:
+            print(f"  {result['size']:>9,} tasks: FAILED — {result['error'].splitlines()[-1]}")
+            continue
+        rss, disk = result["rss_mb"], result["disk_bytes"] / 2**20
+        print(f"  {result['size']:>9,} tasks   RSS {rss['loaded']} MB (peak {rss['peak']})   disk {disk:.1f} MB")
+        for name, op in result["operations"].items():
+            lat = op["latency_ms"]
+            print(f"    {name:<26} {op['ops_per_second']:>12,.1f} ops/s   "
+                  f"p50 {lat['p50']:>10.3f} ms   p99 {lat['p99']:>10.3f} ms")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Chain State Module
+Reads the global state of per-task escrow apps (see app_factory.py) for
+many tasks at once, for GET /tasks?chain=true.
+
+Lookups for a page of tasks run concurrently, at most CHAIN_STATE_CONCURRENCY
+algod calls at a time, and each app's global state is decoded once into
+{ status, amount, deadline, creator, worker }. Decoded states are cached
+with the round they were read at and reused for CHAIN_STATE_MAX_AGE_ROUNDS
+rounds. The current round itself is fetched at most every
+CHAIN_STATE_ROUND_SECONDS, so a warm page costs no algod calls. Status
+transitions call invalidate(), so the next read of that app goes to algod.
+"""
+
+import asyncio
+import base64
+import os
+import time
+from typing import Optional
+from dotenv import load_dotenv
+
+import escrow
+import metrics
+import tracing
+
+load_dotenv()
+
+CHAIN_STATE_CONCURRENCY = int(os.getenv("CHAIN_STATE_CONCURRENCY", "8"))
+CHAIN_STATE_MAX_AGE_ROUNDS = int(os.getenv("CHAIN_STATE_MAX_AGE_ROUNDS", "10"))
+CHAIN_STATE_ROUND_SECONDS = float(os.getenv("CHAIN_STATE_ROUND_SECONDS", "2.5"))
+CHAIN_STATE_CACHE_MAX = int(os.getenv("CHAIN_STATE_CACHE_MAX", "10000"))
+
+_states: dict = {}  # { app_id: (round read at, decoded state or None if the app is gone) }
+_round: list = [0, 0.0]  # [last known round, monotonic time it was fetched]
+
+
+def decode_global_state(entries: list) -> dict:
+    """
+    Decode algod's global-state list ([{key, value: {type, bytes, uint}}],
+    base64 keys and byte values) into the escrow contract's fields.
+    Addresses are returned in Algorand's base32 form, empty if unset.
+    """
+    from algosdk import encoding
+
+    raw = {}
+    for entry in entries:
+        key = base64.b64decode(entry["key"]).decode("utf-8", errors="replace")
+        value = entry["value"]
+        raw[key] = base64.b64decode(value.get("bytes", "")) if value["type"] == 1 else value.get("uint", 0)
+
+    def address(value) -> str:
+        return encoding.encode_address(value) if isinstance(value, bytes) and len(value) == 32 else ""
+
+    status = raw.get("status", b"")
+    return {
+        "status": status.decode("utf-8", errors="replace") if isinstance(status, bytes) else None,
+        "amount": raw.get("amount", 0) / escrow.ALGO_TO_MICROALGO,
+        "deadline": raw.get("deadline", 0),
+        "creator": address(raw.get("creator")),
+        "worker": address(raw.get("worker")),
+    }
+
+
+def invalidate(app_id: Optional[int]):
+    """Drop a cached state after a transition, so the next read goes to algod."""
+    if app_id is not None:
+        _states.pop(app_id, None)
+
+
+def _refresh_round(client) -> int:
+    _round[0] = client.status()["last-round"]
+    _round[1] = time.monotonic()
+    return _round[0]
+
+
+def _fetch(client, app_id: int):
+    """One algod lookup; None if the app was deleted or never existed."""
+    from algosdk.error import AlgodHTTPError
+
+    try:
+        info = client.application_info(app_id)
+    except AlgodHTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+    return decode_global_state(info.get("params", {}).get("global-state", []))
+
+
+@tracing.traced("chain_state.get_app_states")
+async def get_app_states(app_ids: list) -> dict:
+    """
+    Global state of each escrow app, from the round cache or algod.
+
+    Args:
+        app_ids: App IDs to read (duplicates and None are ignored)
+
+    Returns:
+        { app_id: { status, amount, deadline, creator, worker, round } or None }.
+        Apps whose lookup failed are left out. Returns {} without an algod client.
+    """
+    app_ids = {app_id for app_id in app_ids if app_id is not None}
+    client = escrow.get_algod_client()
+    if not app_ids or client is None:
+        return {}
+
+    round_ = _round[0]
+    if time.monotonic() - _round[1] >= CHAIN_STATE_ROUND_SECONDS:
+        try:
+            round_ = await asyncio.to_thread(_refresh_round, client)
+        except Exception as e:
+            print(f"⚠️  algod status lookup failed: {e}")
+            return {}
+
+    results = {}
+    misses = []
+    for app_id in app_ids:
+        cached = _states.get(app_id)
+        if cached is not None and round_ - cached[0] < CHAIN_STATE_MAX_AGE_ROUNDS:
+            results[app_id] = cached[1] and {**cached[1], "round": cached[0]}
+        else:
+            misses.append(app_id)
+    metrics.CACHE_REQUESTS.inc(len(results), cache="chain_state", result="hit")
+    metrics.CACHE_REQUESTS.inc(len(misses), cache="chain_state", result="miss")
+
+    slots = asyncio.Semaphore(CHAIN_STATE_CONCURRENCY)
+
+    async def fetch(app_id: int):
+        async with slots:
+            try:
+                state = await asyncio.to_thread(_fetch, client, app_id)
+            except Exception as e:
+                print(f"⚠️  algod lookup of app {app_id} failed: {e}")
+                return
+        if len(_states) >= CHAIN_STATE_CACHE_MAX:
+            _states.pop(next(iter(_states)))
+        _states[app_id] = (round_, state)
+        results[app_id] = state and {**state, "round": round_}
+
+    if misses:
+        with metrics.ESCROW_CALL_DURATION.time(operation="read_app_states"):
+            await asyncio.gather(*(fetch(app_id) for app_id in misses))
+    return results
@@ -0,0 +1,181 @@
+"""
+GigBounty — Compiled Contract Cache
+
+Building the PyTeal expression tree and running compileTeal costs ~150 ms
+of CPU and imports pyteal; algod's /teal/compile is a network round trip.
+Neither result changes unless the contract does, so both are cached on disk
+under a key hashed from escrow_contract.py's source and the installed PyTeal
+version:
+
+    contracts/build/escrow-<key>.json
+        { key, pyteal_version, approval_teal, clear_teal,
+          approval_program, clear_program,   # base64 algod bytecode
+          approval_hash, clear_hash }        # program addresses
+
+Editing the contract or upgrading PyTeal changes the key, so a stale program
+is never deployed. Files are written atomically; a corrupt or foreign file
+is treated as a miss.
+
+Usage:
+    from contracts.artifacts import compiled_programs
+    programs = compiled_programs(algod_client)   # {"approval": bytes, "clear": bytes, ...}
+
+    python -m contracts.artifacts            # prebuild the TEAL (e.g. at deploy)
+    python -m contracts.artifacts --algod    # ...and the algod bytecode
+"""
+
+import base64
+import hashlib
+import importlib.metadata
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CONTRACT_SOURCE = os.path.join(os.path.dirname(__file__), "escrow_contract.py")
+CONTRACT_CACHE_DIR = os.getenv("CONTRACT_CACHE_DIR") or os.path.join(os.path.dirname(__file__), "build")
+
+_lock = threading.Lock()
+_memo: dict = {}  # { key: artifact dict } — skips the disk after the first hit
+
+
+def _pyteal_version() -> str:
+    """Installed PyTeal version, read from package metadata without importing pyteal."""
+    try:
+        return importlib.metadata.version("pyteal")
+    except importlib.metadata.PackageNotFoundError:
+        return "missing"
+
+
+def cache_key() -> str:
+    """sha256 of the contract source and the PyTeal version that compiles it."""
+    digest = hashlib.sha256()
+    with open(CONTRACT_SOURCE, "rb") as f:
+        digest.update(f.read())
+    digest.update(b"\0pyteal=" + _pyteal_version().encode())
+    return digest.hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(CONTRACT_CACHE_DIR, f"escrow-{key[:16]}.json")
+
+
+def _read(key: str) -> Optional[dict]:
+    try:
+        with open(_cache_path(key), "r") as f:
+            artifact = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(artifact, dict) or artifact.get("key") != key:
+        return None
+    return artifact
+
+
+def _write(artifact: dict):
+    """Atomically replace the cache file (concurrent workers may race; last one wins)."""
+    os.makedirs(CONTRACT_CACHE_DIR, exist_ok=True)
+    path = _cache_path(artifact["key"])
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(artifact, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _artifact(key: str) -> dict:
+    """Cached TEAL for `key`, running PyTeal only on a miss."""
+    artifact = _memo.get(key) or _read(key)
+    if artifact is None:
+        from contracts.escrow_contract import compile_contract
+
+        approval_teal, clear_teal = compile_contract()
+        artifact = {
+            "key": key,
+            "pyteal_version": _pyteal_version(),
+            "built_at": datetime.utcnow().isoformat(),
+            "approval_teal": approval_teal,
+            "clear_teal": clear_teal,
+        }
+        _write(artifact)
+        print(f"🔨 Compiled escrow contract TEAL (cache key {key[:16]})")
+    _memo[key] = artifact
+    return artifact
+
+
+def teal_programs() -> tuple:
+    """
+    TEAL source of the escrow contract, from the cache when unchanged.
+
+    Returns:
+        (approval_teal: str, clear_teal: str)
+
+    Raises:
+        ImportError if the cache misses and pyteal is not installed.
+    """
+    with _lock:
+        artifact = _artifact(cache_key())
+    return artifact["approval_teal"], artifact["clear_teal"]
+
+
+def compiled_programs(client) -> dict:
+    """
+    algod-compiled bytecode of the escrow contract, from the cache when unchanged.
+
+    Args:
+        client: AlgodClient used for /teal/compile on a cache miss
+
+    Returns:
+        { key, approval: bytes, clear: bytes, approval_hash: str, clear_hash: str }
+
+    Raises:
+        ImportError if pyteal is needed but not installed; algosdk errors
+        if algod cannot compile the programs.
+    """
+    with _lock:
+        key = cache_key()
+        artifact = _artifact(key)
+        if "approval_program" not in artifact:
+            approval = client.compile(artifact["approval_teal"])
+            clear = client.compile(artifact["clear_teal"])
+            artifact = {
+                **artifact,
+                "approval_program": approval["result"],
+                "approval_hash": approval["hash"],
+                "clear_program": clear["result"],
+                "clear_hash": clear["hash"],
+            }
+            _write(artifact)
+            _memo[key] = artifact
+            print(f"🔨 Compiled escrow contract bytecode with algod (cache key {key[:16]})")
+
+    return {
+        "key": key,
+        "approval": base64.b64decode(artifact["approval_program"]),
+        "clear": base64.b64decode(artifact["clear_program"]),
+        "approval_hash": artifact["approval_hash"],
+        "clear_hash": artifact["clear_hash"],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    parser = argparse.ArgumentParser(description="Prebuild the compiled escrow contract cache")
+    parser.add_argument("--algod", action="store_true", help="also compile to bytecode with algod (ALGOD_SERVER)")
+    args = parser.parse_args()
+
+    approval_teal, clear_teal = teal_programs()
+    print(f"✅ TEAL cached in {_cache_path(cache_key())} "
+          f"(approval {len(approval_teal)} chars, clear {len(clear_teal)} chars)")
+    if args.algod:
+        from escrow import get_algod_client
+
+        programs = compiled_programs(get_algod_client())
+        print(f"✅ Bytecode cached (approval {len(programs['approval'])} bytes, "
+              f"clear {len(programs['clear'])} bytes)")
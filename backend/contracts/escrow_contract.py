@@ -21,6 +21,9 @@ Global State:
 Usage:
     from contracts.escrow_contract import approval_program, clear_program, compile_contract
     teal_approval, teal_clear = compile_contract()
+
+Deployments should go through contracts/artifacts.py, which caches the
+compiled TEAL and algod bytecode on disk until this file changes.
 """
 
 try:
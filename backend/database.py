@@ -1,9 +1,18 @@
+import asyncio
+import bisect
 import json
 import os
+import threading
 import uuid
 from datetime import datetime
 from typing import Optional
 
+import metrics
+import search
+import storage
+import tracing
+from models import TaskResponse
+
 DB_FILE = os.path.join(os.path.dirname(__file__), "tasks_db.json")
 ROLES_FILE = os.path.join(os.path.dirname(__file__), "wallet_roles.json")
 
@@ -11,23 +20,404 @@ ROLES_FILE = os.path.join(os.path.dirname(__file__), "wallet_roles.json")
 _tasks: dict = {}
 _wallet_roles: dict = {}  # { wallet_address: 'poster' | 'acceptor' }
 
+# Pre-serialized task JSON (validated once through TaskResponse when written)
+_task_json: dict = {}  # { task_id: bytes }
+_newest_first: Optional[list] = None  # task ids sorted by created_at desc
+_all_tasks_json: Optional[bytes] = None
+
+# Field projections (?fields= / ?view=summary), cached per field set like the
+# full representation. Oldest field set is dropped past PROJECTION_CACHE_MAX.
+TASK_FIELDS = tuple(TaskResponse.model_fields)
+SUMMARY_FIELDS = ("id", "title", "amount", "status", "deadline", "created_at",
+                  "creator_wallet", "worker_wallet", "version")
+PROJECTION_CACHE_MAX = 16
+_projected_json: dict = {}  # { fields tuple: { task_id: bytes } }
+_cache_stats: dict = {"task_json": [0, 0], "task_list_json": [0, 0]}  # { cache: [hits, misses] }
+
+# Change feed: every committed write gets a sequence number (persisted on the
+# task as change_seq) and is pushed to subscriber queues (GET /tasks/stream)
+_change_seq: int = 0
+_subscribers: set = set()
+
+# Bounded change log for delta sync (GET /tasks/changes). Parallel lists sorted
+# by seq; changes at or below _change_log_floor are no longer answerable.
+CHANGE_LOG_MAX = int(os.getenv("CHANGE_LOG_MAX", "10000"))
+_change_log_seqs: list = []
+_change_log_entries: list = []  # (task_id, "created" | "updated" | "deleted")
+_change_log_floor: int = 0
+
+# Sorted range indexes for filtering/sorting without a table scan.
+# Deadlines are "YYYY-MM-DD" strings and compare lexicographically; tasks
+# without one (or with a malformed one, from before TaskCreate validated
+# deadlines) are not in the deadline index.
+_amount_index: list = []    # [(amount, task_id)]
+_deadline_index: list = []  # [(deadline, task_id)]
+_ID_MAX = "\U0010ffff"      # sorts after every task id, for inclusive upper bounds
+
+# Shared SQLite store when STORAGE_BACKEND=sqlite (multiple worker processes).
+# Writes go to the store first; sync() then applies committed changes — this
+# worker's and other workers' — to the in-memory state above.
+_store = storage.get_store()
+SHARED_STORAGE = _store is not None
+
+# Tasks and roles are loaded by load() — from main.py's startup warm-up, or
+# by the first read or write — so importing this module stays cheap
+_loaded = False
+_load_lock = threading.Lock()
+
+
+class TaskConflictError(Exception):
+    """Raised by transition_task when the task changed since the caller read it."""
+
+    def __init__(self, message: str, current: dict):
+        super().__init__(message)
+        self.current = current
+
 
 def _load_db():
-    """Load tasks from JSON file on startup."""
-    global _tasks
-    if os.path.exists(DB_FILE):
+    """Load tasks from the JSON file (or the shared SQLite store) on startup."""
+    global _tasks, _change_seq, _change_log_floor
+    head = 0
+    if _store is not None:
+        _load_from_store()
+    elif os.path.exists(DB_FILE):
         try:
             with open(DB_FILE, "r") as f:
-                data = json.load(f)
-                _tasks = {t["id"]: t for t in data}
-        except (json.JSONDecodeError, KeyError):
+                tasks, head = _read_db_file(f)
+                _tasks = {t["id"]: t for t in tasks}
+                for t in _tasks.values():
+                    t.setdefault("version", 1)
+                _invalidate()
+        except (json.JSONDecodeError, KeyError, TypeError):
             _tasks = {}
+            _invalidate()
+
+    # Keep sequence numbers monotonic across restarts: the head is persisted
+    # with the tasks, because deletions leave no task to recover it from. The
+    # in-memory change log starts empty, so older `since` values get a full resync.
+    if _store is None:
+        _change_seq = max(head, max((t.get("change_seq", 0) for t in _tasks.values()), default=0))
+    _change_log_seqs.clear()
+    _change_log_entries.clear()
+    _change_log_floor = _change_seq
+
+    search.rebuild(_tasks.values())
+    _rebuild_range_indexes()
+
+
+def _load_from_store():
+    """Load all tasks from SQLite, importing tasks_db.json into a fresh store."""
+    global _tasks, _change_seq
+    tasks, seq = _store.load_tasks()
+    if seq == 0 and os.path.exists(DB_FILE):
+        try:
+            with open(DB_FILE, "r") as f:
+                _store.import_tasks(_read_db_file(f)[0])
+            tasks, seq = _store.load_tasks()
+        except (json.JSONDecodeError, KeyError, TypeError):
+            pass
+    _tasks = {t["id"]: t for t in tasks}
+    for t in _tasks.values():
+        t.setdefault("version", 1)
+    _change_seq = seq
+    _invalidate()
+
+
+def load():
+    """Load tasks and wallet roles from disk or the shared store (once per process)."""
+    global _loaded
+    with _load_lock:
+        if _loaded:
+            return
+        _load_db()
+        _load_roles()
+        _loaded = True
+
+
+def _ensure_loaded():
+    if not _loaded:
+        load()
+
+
+def sync():
+    """
+    Catch up with task changes committed to the shared store (by this or
+    another worker process) since the last one applied here. No-op in JSON
+    mode. Reads call this first, so every worker serves the latest board.
+    """
+    _ensure_loaded()
+    if _store is None or _store.head_seq() == _change_seq:
+        return
+    changes = _store.changes_since(_change_seq)
+    if not changes or changes[0][0] != _change_seq + 1:
+        # Fell behind the retained change log — reload everything
+        _load_db()
+        _publish_resync(_change_seq)
+        return
+    for seq, task_id, event_type, task in changes:
+        _apply_change(seq, task_id, event_type, task)
+
+
+def _apply_change(seq: int, task_id: str, event_type: str, task: Optional[dict]):
+    """Apply one change from the shared store to in-memory state and subscribers."""
+    _record_change(task_id, event_type, seq)
+    if event_type != "deleted" and (task is None or task.get("change_seq") != seq):
+        return  # superseded by a later change in the same batch
+    old = _tasks.get(task_id)
+    if event_type == "deleted":
+        if old is None:
+            return
+        del _tasks[task_id]
+        search.remove_task(task_id)
+        _range_index_remove(old)
+        _invalidate(task_id, reorder=True)
+        _publish(seq, "deleted", old, old["status"])
+        return
+
+    task.setdefault("version", 1)
+    if old is not None:
+        _range_index_remove(old)
+    _tasks[task_id] = task
+    _range_index_add(task)
+    if old is None or old["title"] != task["title"] or old["description"] != task["description"]:
+        search.index_task(task)
+    _invalidate(task_id, reorder=old is None)
+    _publish(seq, event_type, task, old["status"] if old is not None else None)
+
+
+def _read_db_file(f) -> tuple:
+    """(tasks, change_seq head) from tasks_db.json; older files are a bare task list."""
+    data = json.load(f)
+    if isinstance(data, list):
+        return data, 0
+    return data["tasks"], data.get("change_seq", 0)
 
 
 def _save_db():
-    """Persist tasks to JSON file."""
-    with open(DB_FILE, "w") as f:
-        json.dump(list(_tasks.values()), f, indent=2, default=str)
+    """Persist tasks (and the change feed's sequence head) to JSON file."""
+    with tracing.span("db.save_json", tasks=len(_tasks)), \
+            metrics.DB_FLUSH_DURATION.time(backend="json"), open(DB_FILE, "w") as f:
+        json.dump({"change_seq": _change_seq, "tasks": list(_tasks.values())}, f, indent=2, default=str)
+
+
+# ─── Serialized Response Cache ───────────────────────────────
+
+
+def _invalidate(task_id: Optional[str] = None, reorder: bool = False):
+    """
+    Drop cached JSON for one task (or all tasks if task_id is None).
+    `reorder` also drops the newest-first ordering (tasks added/removed).
+    """
+    global _newest_first, _all_tasks_json
+    if task_id is None:
+        _task_json.clear()
+        _projected_json.clear()
+        _newest_first = None
+    else:
+        _task_json.pop(task_id, None)
+        for cache in _projected_json.values():
+            cache.pop(task_id, None)
+        if reorder:
+            _newest_first = None
+    _all_tasks_json = None
+
+
+def _serialize(task: dict, fields: Optional[tuple] = None) -> bytes:
+    """
+    TaskResponse-shaped JSON bytes for a task, cached until it changes.
+    `fields` (from resolve_fields) limits the output to those fields.
+    """
+    if fields is None:
+        cache = _task_json
+    else:
+        cache = _projected_json.get(fields)
+        if cache is None:
+            if len(_projected_json) >= PROJECTION_CACHE_MAX:
+                _projected_json.pop(next(iter(_projected_json)))
+            cache = _projected_json[fields] = {}
+    cached = cache.get(task["id"])
+    stats = _cache_stats["task_json"]
+    if cached is not None:
+        stats[0] += 1
+    else:
+        stats[1] += 1
+        model = TaskResponse.model_validate(task)
+        cached = (model.model_dump_json() if fields is None else model.model_dump_json(include=set(fields))).encode()
+        cache[task["id"]] = cached
+    return cached
+
+
+def _join(task_ids, fields: Optional[tuple] = None) -> bytes:
+    return b"[" + b",".join(_serialize(_tasks[i], fields) for i in task_ids) + b"]"
+
+
+def resolve_fields(fields: Optional[str] = None, view: Optional[str] = None) -> Optional[tuple]:
+    """
+    Parse ?fields=a,b,c / ?view=full|summary into a projection for the
+    *_json functions (None = every field). `id` is always included.
+
+    Raises:
+        ValueError for an unknown field or view.
+    """
+    if fields:
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = requested - set(TASK_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                             f"Valid fields: {', '.join(TASK_FIELDS)}")
+        requested.add("id")
+        return tuple(f for f in TASK_FIELDS if f in requested)
+    if view in (None, "", "full"):
+        return None
+    if view == "summary":
+        return SUMMARY_FIELDS
+    raise ValueError("view must be 'full' or 'summary'")
+
+
+def get_task_json(task_id: str) -> Optional[bytes]:
+    """Serialized TaskResponse JSON for one task, or None if not found."""
+    sync()
+    task = _tasks.get(task_id)
+    return _serialize(task) if task is not None else None
+
+
+def get_all_tasks_json(fields: Optional[tuple] = None) -> bytes:
+    """Serialized JSON array of all tasks, newest first, joined from cached bytes."""
+    global _newest_first, _all_tasks_json
+    sync()
+    if _newest_first is None:
+        _newest_first = [t["id"] for t in get_all_tasks()]
+    if fields is not None:
+        return _join(_newest_first, fields)
+    if _all_tasks_json is None:
+        _cache_stats["task_list_json"][1] += 1
+        _all_tasks_json = _join(_newest_first)
+    else:
+        _cache_stats["task_list_json"][0] += 1
+    return _all_tasks_json
+
+
+def _collect_cache_metrics():
+    for cache, (hits, misses) in _cache_stats.items():
+        metrics.CACHE_REQUESTS.set_total(hits, cache=cache, result="hit")
+        metrics.CACHE_REQUESTS.set_total(misses, cache=cache, result="miss")
+
+
+metrics.register_collector(_collect_cache_metrics)
+
+
+# ─── Change Feed ─────────────────────────────────────────────
+
+
+def subscribe(maxsize: int = 1000) -> asyncio.Queue:
+    """
+    Register for task change events. Each event is a dict:
+        { seq, type: "created"|"updated"|"deleted"|"resync", task, prev_status, data }
+    where `data` is the pre-serialized JSON payload for the event.
+    A subscriber that falls `maxsize` events behind gets a single "resync"
+    event instead and should re-fetch GET /tasks.
+    """
+    queue = asyncio.Queue(maxsize=maxsize)
+    _subscribers.add(queue)
+    return queue
+
+
+def unsubscribe(queue: asyncio.Queue):
+    """Stop delivering change events to a queue."""
+    _subscribers.discard(queue)
+
+
+def _record_change(task_id: str, event_type: str, seq: Optional[int] = None) -> int:
+    """
+    Append a change to the change log. Assigns the next sequence number,
+    unless `seq` was already assigned by the shared store.
+    """
+    global _change_seq, _change_log_floor
+    _change_seq = seq if seq is not None else _change_seq + 1
+    _change_log_seqs.append(_change_seq)
+    _change_log_entries.append((task_id, event_type))
+    if len(_change_log_seqs) > CHANGE_LOG_MAX:
+        # Drop the oldest 10% in one go rather than one entry per write
+        cut = max(1, CHANGE_LOG_MAX // 10)
+        _change_log_floor = _change_log_seqs[cut - 1]
+        del _change_log_seqs[:cut]
+        del _change_log_entries[:cut]
+    return _change_seq
+
+
+def _publish(seq: int, event_type: str, task: dict, prev_status: Optional[str] = None):
+    """Fan a committed change out to stream subscribers."""
+    if not _subscribers:
+        return
+
+    if event_type == "deleted":
+        task_json = json.dumps({"id": task["id"]}).encode()
+    else:
+        task_json = _serialize(task)
+    data = b'{"seq":%d,"type":"%s","task":%s}' % (seq, event_type.encode(), task_json)
+    event = {
+        "seq": seq,
+        "type": event_type,
+        "task": dict(task),
+        "prev_status": prev_status,
+        "data": data,
+    }
+    for queue in list(_subscribers):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer — replace its backlog with a single resync marker
+            _resync(queue, seq)
+
+
+def _resync(queue: asyncio.Queue, seq: int):
+    while not queue.empty():
+        queue.get_nowait()
+    queue.put_nowait({
+        "seq": seq, "type": "resync", "task": None, "prev_status": None,
+        "data": b'{"seq":%d,"type":"resync","task":null}' % seq,
+    })
+
+
+def _publish_resync(seq: int):
+    """Tell every subscriber to re-fetch (state was reloaded wholesale)."""
+    for queue in list(_subscribers):
+        _resync(queue, seq)
+
+
+def get_changes_json(since: int, fields: Optional[tuple] = None) -> bytes:
+    """
+    Serialized delta of tasks changed after sequence number `since`:
+        { version, full, tasks: [TaskResponse...], deleted: [{id, seq}...] }
+
+    `version` is the new high-water mark to pass as `since` next time. If
+    `since` is 0, older than the retained change log, or from before a
+    restart, `full` is true and `tasks` holds the whole board instead.
+    """
+    sync()
+    if since <= 0 or since < _change_log_floor or since > _change_seq:
+        return b'{"version":%d,"full":true,"tasks":%s,"deleted":[]}' % (
+            _change_seq, get_all_tasks_json(fields)
+        )
+
+    # Latest change per task after `since`, oldest first
+    start = bisect.bisect_right(_change_log_seqs, since)
+    latest = {}
+    for seq, (task_id, event_type) in zip(_change_log_seqs[start:], _change_log_entries[start:]):
+        latest.pop(task_id, None)
+        latest[task_id] = (seq, event_type)
+
+    changed, deleted = [], []
+    for task_id, (seq, event_type) in latest.items():
+        task = _tasks.get(task_id)
+        if event_type == "deleted" or task is None:
+            deleted.append(b'{"id":%s,"seq":%d}' % (json.dumps(task_id).encode(), seq))
+        else:
+            changed.append(_serialize(task, fields))
+
+    return b'{"version":%d,"full":false,"tasks":[%s],"deleted":[%s]}' % (
+        _change_seq, b",".join(changed), b",".join(deleted)
+    )
 
 
 def create_task(
@@ -51,37 +441,313 @@ def create_task(
         "created_at": datetime.utcnow().isoformat(),
         "deadline": deadline,
         "tx_id": None,
+        "version": 1,
     }
+    _ensure_loaded()
+    if _store is not None:
+        _store.insert_task(task)
+        sync()
+        return dict(_tasks[task_id])
+    task["change_seq"] = _record_change(task_id, "created")
     _tasks[task_id] = task
+    search.index_task(task)
+    _range_index_add(task)
+    _invalidate(task_id, reorder=True)
     _save_db()
-    return task
+    _publish(task["change_seq"], "created", task)
+    return dict(task)
 
 
 def get_all_tasks() -> list:
     """Get all tasks, newest first."""
+    sync()
     return sorted(_tasks.values(), key=lambda t: t["created_at"], reverse=True)
 
 
+# ─── Range Indexes ───────────────────────────────────────────
+
+
+def _deadline_key(task: dict) -> Optional[str]:
+    """The task's deadline if it is a valid YYYY-MM-DD date, else None."""
+    deadline = task.get("deadline")
+    if not isinstance(deadline, str) or len(deadline) != 10:
+        return None
+    try:
+        datetime.strptime(deadline, "%Y-%m-%d")
+    except ValueError:
+        return None
+    return deadline
+
+
+def _range_index_add(task: dict):
+    bisect.insort(_amount_index, (task["amount"], task["id"]))
+    if _deadline_key(task):
+        bisect.insort(_deadline_index, (task["deadline"], task["id"]))
+
+
+def _range_index_remove(task: dict):
+    for index, key in ((_amount_index, task["amount"]), (_deadline_index, _deadline_key(task))):
+        if key is None:
+            continue
+        i = bisect.bisect_left(index, (key, task["id"]))
+        if i < len(index) and index[i] == (key, task["id"]):
+            del index[i]
+
+
+def _rebuild_range_indexes():
+    _amount_index[:] = sorted((t["amount"], t["id"]) for t in _tasks.values())
+    _deadline_index[:] = sorted((t["deadline"], t["id"]) for t in _tasks.values() if _deadline_key(t))
+
+
+def get_open_deadlines() -> list:
+    """(deadline, task_id) of every OPEN task with a deadline, earliest first (from the deadline index)."""
+    sync()
+    return [(deadline, task_id) for deadline, task_id in _deadline_index if _tasks[task_id]["status"] == "OPEN"]
+
+
+def _index_range(index: list, lo=None, hi=None) -> list:
+    """Task ids with lo <= key <= hi (either bound optional), in key order."""
+    start = bisect.bisect_left(index, (lo,)) if lo is not None else 0
+    end = bisect.bisect_right(index, (hi, _ID_MAX)) if hi is not None else len(index)
+    return [task_id for _, task_id in index[start:end]]
+
+
+# Supported `sort` values for query_tasks_json
+SORT_FIELDS = ("created_at", "-created_at", "amount", "-amount", "deadline", "-deadline")
+
+
+def query_tasks_json(
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    deadline_after: Optional[str] = None,
+    deadline_before: Optional[str] = None,
+    sort: str = "-created_at",
+    fields: Optional[tuple] = None,
+) -> bytes:
+    """
+    Serialized task list filtered by amount/deadline ranges (inclusive) and sorted.
+
+    Range filters are answered by bisecting the sorted amount/deadline indexes;
+    when both are given, the narrower slice is scanned and the other bound
+    checked per task. Sorting by the field of the index used needs no sort.
+    Tasks without a (valid) deadline are excluded by deadline filters and
+    listed last when sorting by deadline.
+    """
+    sync()
+    amount_filter = min_amount is not None or max_amount is not None
+    deadline_filter = deadline_after is not None or deadline_before is not None
+    field, descending = sort.lstrip("-"), sort.startswith("-")
+
+    if not amount_filter and not deadline_filter and sort == "-created_at":
+        return get_all_tasks_json(fields)
+
+    # 1. Candidate ids from the range indexes, remembering which order they're in
+    ordered_by = None
+    undated = []  # appended after sorting by deadline, in either direction
+    if amount_filter and deadline_filter:
+        by_amount = _index_range(_amount_index, min_amount, max_amount)
+        by_deadline = _index_range(_deadline_index, deadline_after, deadline_before)
+        if len(by_amount) <= len(by_deadline):
+            ids, ordered_by = by_amount, "amount"
+            ids = [i for i in ids if _in_range(_deadline_key(_tasks[i]), deadline_after, deadline_before)]
+        else:
+            ids, ordered_by = by_deadline, "deadline"
+            ids = [i for i in ids if _in_range(_tasks[i]["amount"], min_amount, max_amount)]
+    elif amount_filter:
+        ids, ordered_by = _index_range(_amount_index, min_amount, max_amount), "amount"
+    elif deadline_filter:
+        ids, ordered_by = _index_range(_deadline_index, deadline_after, deadline_before), "deadline"
+    elif field == "amount":
+        ids, ordered_by = _index_range(_amount_index), "amount"
+    elif field == "deadline":
+        ids, ordered_by = _index_range(_deadline_index), "deadline"
+        undated = [t["id"] for t in _tasks.values() if not _deadline_key(t)]
+    else:
+        ids = list(_tasks)
+
+    # 2. Order — free if the candidates already come from the matching index
+    if ordered_by != field:
+        if field == "deadline":
+            undated = [i for i in ids if not _deadline_key(_tasks[i])]
+            ids = sorted((i for i in ids if _deadline_key(_tasks[i])), key=lambda i: _tasks[i]["deadline"])
+        else:
+            ids.sort(key=lambda i: _tasks[i][field])
+    if descending:
+        ids.reverse()
+    ids += undated
+
+    return _join(ids, fields)
+
+
+def _in_range(value, lo, hi) -> bool:
+    if value is None:
+        return False
+    return (lo is None or value >= lo) and (hi is None or value <= hi)
+
+
+def search_tasks_json(query: str, status: Optional[str] = None,
+                      limit: int = 20, offset: int = 0, fields: Optional[tuple] = None) -> bytes:
+    """
+    Serialized BM25-ranked search results over task titles/descriptions:
+        { total, offset, limit, tasks: [TaskResponse + score...] }
+    `status` optionally restricts results to those statuses (comma-separated).
+    """
+    sync()
+    accept = None
+    if status:
+        statuses = {s.strip().upper() for s in status.split(",") if s.strip()}
+        accept = lambda task_id: _tasks[task_id]["status"] in statuses
+
+    total, page = search.search(query, limit=limit, offset=offset, accept=accept)
+    results = [
+        _serialize(_tasks[task_id], fields)[:-1] + b',"score":%.4f}' % score
+        for task_id, score in page
+    ]
+    return b'{"total":%d,"offset":%d,"limit":%d,"tasks":[%s]}' % (
+        total, offset, limit, b",".join(results)
+    )
+
+
 def get_task(task_id: str) -> Optional[dict]:
-    """Get a single task by ID."""
-    return _tasks.get(task_id)
+    """
+    Get a single task by ID.
+
+    Returns a snapshot copy, so the version a handler read stays fixed while
+    it awaits I/O (see transition_task).
+    """
+    sync()
+    task = _tasks.get(task_id)
+    return dict(task) if task is not None else None
 
 
 def update_task(task_id: str, updates: dict) -> Optional[dict]:
-    """Update task fields."""
+    """Update task fields (unconditionally) and bump the task version."""
+    return _update(task_id, updates)
+
+
+def _update(task_id: str, updates: dict, bump_version: bool = True) -> Optional[dict]:
+    _ensure_loaded()
+    if _store is not None:
+        return _store_update(task_id, updates, bump_version=bump_version)
     if task_id not in _tasks:
         return None
-    _tasks[task_id].update(updates)
+    task = _tasks[task_id]
+    prev_status = task["status"]
+    reindex_range = "amount" in updates or "deadline" in updates
+    if reindex_range:
+        _range_index_remove(task)
+    task.update(updates)
+    if reindex_range:
+        _range_index_add(task)
+    if bump_version:
+        task["version"] = task.get("version", 1) + 1
+    task["change_seq"] = _record_change(task_id, "updated")
+    if "title" in updates or "description" in updates:
+        search.index_task(task)
+    _invalidate(task_id)
     _save_db()
-    return _tasks[task_id]
+    _publish(task["change_seq"], "updated", task, prev_status)
+    return dict(task)
+
 
+def record_escrow_app(task_id: str, app_id: int) -> Optional[dict]:
+    """
+    Record the escrow application deployed for a task (see app_factory.py).
+
+    The app ID is metadata, not a state transition, so the task version is
+    left alone: a handler mid-way through a compare-and-set (e.g. a payout
+    awaiting the chain) must not see a conflict because an app was recorded.
+    The change is still published to the change feed.
+    """
+    return _update(task_id, {"app_id": app_id}, bump_version=False)
+
+
+def get_app_ids(task_ids) -> dict:
+    """{ task_id: app_id } for the given tasks that have an escrow app."""
+    sync()
+    return {
+        task_id: _tasks[task_id]["app_id"]
+        for task_id in task_ids
+        if task_id in _tasks and _tasks[task_id].get("app_id") is not None
+    }
+
+
+def transition_task(
+    task_id: str,
+    updates: dict,
+    expected_status: Optional[str] = None,
+    expected_version: Optional[int] = None,
+) -> Optional[dict]:
+    """
+    Compare-and-set update: apply `updates` only if the task still has the
+    expected status and/or version, then bump the version.
+
+    Handlers read a task, check it, await I/O, and then write; passing the
+    version they read makes a concurrent writer's change visible as a
+    conflict instead of being silently overwritten. Reads stay lock-free.
+
+    Returns:
+        The updated task, or None if the task does not exist.
+
+    Raises:
+        TaskConflictError if the status or version no longer matches.
+    """
+    _ensure_loaded()
+    if _store is not None:
+        # Checked inside the store's write transaction, so the CAS holds across workers
+        return _store_update(task_id, updates, expected_status, expected_version)
+    task = _tasks.get(task_id)
+    if task is None:
+        return None
+    _check_expected(task, expected_status, expected_version)
+    return update_task(task_id, updates)
+
+
+def _check_expected(task: dict, expected_status: Optional[str], expected_version: Optional[int]):
+    if expected_status is not None and task["status"] != expected_status:
+        raise TaskConflictError(
+            f"Task status changed (expected {expected_status}, now {task['status']})", dict(task)
+        )
+    if expected_version is not None and task.get("version", 1) != expected_version:
+        raise TaskConflictError(
+            f"Task was modified concurrently (expected version {expected_version}, "
+            f"now {task.get('version', 1)})", dict(task)
+        )
+
+
+def _store_update(
+    task_id: str,
+    updates: dict,
+    expected_status: Optional[str] = None,
+    expected_version: Optional[int] = None,
+    bump_version: bool = True,
+) -> Optional[dict]:
+    """update_task/transition_task against the shared SQLite store."""
+    def mutate(current: dict) -> dict:
+        _check_expected(current, expected_status, expected_version)
+        version = current.get("version", 1) + 1 if bump_version else current.get("version", 1)
+        return {**current, **updates, "version": version}
+
+    task = _store.modify_task(task_id, mutate)
+    sync()
+    return dict(task) if task is not None else None
 
 
 def delete_task(task_id: str) -> bool:
     """Delete a task."""
+    _ensure_loaded()
+    if _store is not None:
+        deleted = _store.delete_task(task_id)
+        sync()
+        return deleted
     if task_id in _tasks:
-        del _tasks[task_id]
+        task = _tasks.pop(task_id)
+        seq = _record_change(task_id, "deleted")
+        search.remove_task(task_id)
+        _range_index_remove(task)
+        _invalidate(task_id, reorder=True)
         _save_db()
+        _publish(seq, "deleted", task, task["status"])
         return True
     return False
 
@@ -89,7 +755,7 @@ def delete_task(task_id: str) -> bool:
 # ─── Wallet Roles ─────────────────────────────────────────────
 
 def _load_roles():
-    """Load wallet roles from JSON file on startup."""
+    """Load wallet roles from JSON file on startup (imported into SQLite mode's store)."""
     global _wallet_roles
     if os.path.exists(ROLES_FILE):
         try:
@@ -97,6 +763,8 @@ def _load_roles():
                 _wallet_roles = json.load(f)
         except (json.JSONDecodeError, TypeError):
             _wallet_roles = {}
+    if _store is not None and _wallet_roles:
+        _store.import_roles(_wallet_roles)
 
 
 def _save_roles():
@@ -107,16 +775,19 @@ def _save_roles():
 
 def get_wallet_role(address: str) -> Optional[str]:
     """Get role for a wallet address ('poster' | 'acceptor' | None)."""
+    _ensure_loaded()
+    if _store is not None:
+        return _store.get_role(address)
     return _wallet_roles.get(address)
 
 
 def set_wallet_role(address: str, role: str) -> str:
     """Set role for a wallet address."""
+    _ensure_loaded()
+    if _store is not None:
+        _store.set_role(address, role)
+        return role
     _wallet_roles[address] = role
     _save_roles()
     return role
 
-
-# Load on import
-_load_db()
-_load_roles()
@@ -6,9 +6,15 @@ Includes 3% platform fee logic, Indexer-based tx verification, and double-spend
 
 import os
 import json
+import threading
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
 
+import metrics
+import storage
+import tracing
+
 load_dotenv()
 
 # ─── Configuration ────────────────────────────────────────────
@@ -36,17 +42,31 @@ ALGO_TO_MICROALGO = 1_000_000
 
 USED_TX_FILE = os.path.join(os.path.dirname(__file__), "used_tx_ids.json")
 _used_tx_ids: set = set()
+_used_tx_ids_loaded = False
+_used_tx_lock = threading.Lock()
+
+# Shared used-tx table when STORAGE_BACKEND=sqlite, so a tx_id can't be
+# replayed against a different worker process
+_store = storage.get_store()
 
 
 def _load_used_tx_ids():
-    """Load previously used tx_ids from disk."""
-    global _used_tx_ids
-    if os.path.exists(USED_TX_FILE):
-        try:
-            with open(USED_TX_FILE, "r") as f:
-                _used_tx_ids = set(json.load(f))
-        except (json.JSONDecodeError, TypeError):
-            _used_tx_ids = set()
+    """Load previously used tx_ids from disk (once — on first use or at startup warm-up)."""
+    global _used_tx_ids, _used_tx_ids_loaded
+    if _used_tx_ids_loaded:
+        return
+    with _used_tx_lock:
+        if _used_tx_ids_loaded:
+            return
+        if os.path.exists(USED_TX_FILE):
+            try:
+                with open(USED_TX_FILE, "r") as f:
+                    _used_tx_ids = set(json.load(f))
+            except (json.JSONDecodeError, TypeError):
+                _used_tx_ids = set()
+        if _store is not None and _used_tx_ids:
+            _store.import_used_tx_ids(_used_tx_ids)
+        _used_tx_ids_loaded = True
 
 
 def _save_used_tx_ids():
@@ -55,24 +75,38 @@ def _save_used_tx_ids():
         json.dump(list(_used_tx_ids), f)
 
 
-def _mark_tx_used(tx_id: str):
-    """Record a tx_id as used, preventing reuse."""
+def _mark_tx_used(tx_id: str) -> bool:
+    """
+    Record a tx_id as used, preventing reuse.
+
+    Returns:
+        False if the tx_id was already recorded (e.g. by a concurrent request
+        on another worker between the _is_tx_used check and this call).
+    """
+    _load_used_tx_ids()
+    if _store is not None:
+        return _store.mark_tx_used(tx_id)
+    if tx_id in _used_tx_ids:
+        return False
     _used_tx_ids.add(tx_id)
     _save_used_tx_ids()
+    return True
 
 
 def _is_tx_used(tx_id: str) -> bool:
     """Check if a tx_id has already been used."""
+    _load_used_tx_ids()
+    if _store is not None:
+        return _store.is_tx_used(tx_id)
     return tx_id in _used_tx_ids
 
 
-# Load on import
-_load_used_tx_ids()
-
-
 # ─── Clients ─────────────────────────────────────────────────
+# Built once and shared: algosdk is imported on first use (or by main.py's
+# startup warm-up) rather than when this module is imported.
 
 
+@lru_cache(maxsize=1)
 def get_algod_client():
     """Create Algorand client."""
     try:
@@ -90,6 +124,7 @@ def get_algod_client():
         return None
 
 
+@lru_cache(maxsize=1)
 def get_indexer_client():
     """Create Algorand Indexer client for transaction lookups."""
     try:
@@ -107,22 +142,38 @@ def get_indexer_client():
         return None
 
 
-def get_escrow_address() -> Optional[str]:
-    """Get the escrow wallet address from mnemonic."""
+@lru_cache(maxsize=1)
+def get_escrow_keys() -> tuple:
+    """(private_key, address) derived from ESCROW_MNEMONIC once; (None, None) if unset or invalid."""
     if not ESCROW_MNEMONIC:
-        return None
+        return None, None
     try:
         from algosdk import mnemonic, account
         private_key = mnemonic.to_private_key(ESCROW_MNEMONIC)
-        return account.address_from_private_key(private_key)
+        return private_key, account.address_from_private_key(private_key)
     except Exception as e:
         print(f"⚠️  Failed to get escrow address: {e}")
-        return None
+        return None, None
+
+
+def get_escrow_address() -> Optional[str]:
+    """Get the escrow wallet address from mnemonic."""
+    return get_escrow_keys()[1]
+
+
+def warm_up():
+    """Load used tx_ids, derive the escrow key and build the clients ahead of the first request."""
+    _load_used_tx_ids()
+    get_escrow_keys()
+    get_algod_client()
+    get_indexer_client()
 
 
 # ─── Indexer-Based Transaction Verification ──────────────────
 
 
+@tracing.traced("escrow.verify_transaction_onchain")
+@metrics.timed(metrics.ESCROW_CALL_DURATION, operation="verify_transaction_onchain")
 def verify_transaction_onchain(tx_id: str, expected_sender: str,
                                 expected_receiver: str, min_amount_algo: float) -> dict:
     """
@@ -214,6 +265,7 @@ def verify_transaction_onchain(tx_id: str, expected_sender: str,
 # ─── Payment Verification ────────────────────────────────────
 
 
+@tracing.traced("escrow.verify_payment")
 def verify_payment(sender: str, amount_algo: float, tx_id: str = None) -> dict:
     """
     Verify that a payment was sent to the escrow wallet.
@@ -273,18 +325,15 @@ def verify_payment(sender: str, amount_algo: float, tx_id: str = None) -> dict:
 
     # ─── Double-spend check ───────────────────────────────────
     if _is_tx_used(tx_id):
-        return {
-            "verified": False,
-            "tx_id": tx_id,
-            "message": "This transaction ID has already been used"
-        }
+        return _tx_already_used(tx_id)
 
     # ─── On-chain Indexer verification ────────────────────────
     onchain = verify_transaction_onchain(tx_id, sender, escrow_addr, amount_algo)
 
     if onchain["verified"]:
         # Mark tx_id as used to prevent reuse
-        _mark_tx_used(tx_id)
+        if not _mark_tx_used(tx_id):
+            return _tx_already_used(tx_id)
         return {
             "verified": True,
             "tx_id": tx_id,
@@ -293,7 +342,8 @@ def verify_payment(sender: str, amount_algo: float, tx_id: str = None) -> dict:
 
     # Indexer failed — fall back in debug mode only
     if DEBUG_MODE:
-        _mark_tx_used(tx_id)
+        if not _mark_tx_used(tx_id):
+            return _tx_already_used(tx_id)
         return {
             "verified": True,
             "tx_id": tx_id,
@@ -307,14 +357,29 @@ def verify_payment(sender: str, amount_algo: float, tx_id: str = None) -> dict:
     }
 
 
+def _tx_already_used(tx_id: str) -> dict:
+    return {
+        "verified": False,
+        "tx_id": tx_id,
+        "message": "This transaction ID has already been used"
+    }
+
+
 # ─── Payment Release ─────────────────────────────────────────
 
 
-def release_payment(worker_wallet: str, amount_algo: float) -> dict:
+@tracing.traced("escrow.release_payment")
+@metrics.timed(metrics.ESCROW_CALL_DURATION, operation="release_payment")
+def release_payment(worker_wallet: str, amount_algo: float, on_signed=None) -> dict:
     """
     Release ALGO from escrow to worker wallet.
     Deducts 3% platform fee and sends the rest to the worker.
     In demo mode, simulates the release.
+
+    on_signed(tx_id, last_valid), if given, is called once the transaction is
+    signed and before it is sent, so the caller can record what to follow up
+    on (see payouts.py). A failed result carries "submitted": True if the
+    transaction was sent but not confirmed in time — it may still confirm.
     """
     client = get_algod_client()
 
@@ -331,11 +396,13 @@ def release_payment(worker_wallet: str, amount_algo: float) -> dict:
             "message": f"Demo mode — {worker_payout} ALGO released to {worker_wallet[:8]}... (fee: {platform_fee} ALGO)"
         }
 
+    submitted = False
     try:
-        from algosdk import mnemonic, transaction, account
+        from algosdk import transaction
 
-        private_key = mnemonic.to_private_key(ESCROW_MNEMONIC)
-        escrow_addr = account.address_from_private_key(private_key)
+        private_key, escrow_addr = get_escrow_keys()
+        if private_key is None:
+            raise ValueError("ESCROW_MNEMONIC is not a valid mnemonic")
 
         # Calculate amounts
         platform_fee = round(amount_algo * PLATFORM_FEE_PERCENT, 6)
@@ -354,12 +421,17 @@ def release_payment(worker_wallet: str, amount_algo: float) -> dict:
             note=b"GigBounty Payout",
         )
 
-        # Sign and send
+        # Sign, let the caller record the tx ID, then send
         signed_txn = txn.sign(private_key)
-        tx_id = client.send_transaction(signed_txn)
+        if on_signed is not None:
+            on_signed(signed_txn.get_txid(), txn.last_valid_round)
+        with tracing.span("algod.send_transaction"):
+            tx_id = client.send_transaction(signed_txn)
+        submitted = True
 
         # Wait for confirmation
-        transaction.wait_for_confirmation(client, tx_id, 4)
+        with tracing.span("algod.wait_for_confirmation", tx_id=tx_id):
+            transaction.wait_for_confirmation(client, tx_id, 4)
 
         return {
             "success": True,
@@ -372,6 +444,7 @@ def release_payment(worker_wallet: str, amount_algo: float) -> dict:
     except Exception as e:
         return {
             "success": False,
+            "submitted": submitted,
             "tx_id": None,
             "amount": amount_algo,
             "worker_payout": 0,
@@ -383,11 +456,14 @@ def release_payment(worker_wallet: str, amount_algo: float) -> dict:
 # ─── Refund Payment ──────────────────────────────────────────
 
 
-def refund_payment(creator_wallet: str, amount_algo: float) -> dict:
+@tracing.traced("escrow.refund_payment")
+@metrics.timed(metrics.ESCROW_CALL_DURATION, operation="refund_payment")
+def refund_payment(creator_wallet: str, amount_algo: float, on_signed=None) -> dict:
     """
     Refund ALGO from escrow back to the task creator.
     Used when a task is cancelled or expired.
     No platform fee is deducted on refunds.
+    on_signed and "submitted" work as in release_payment.
     """
     client = get_algod_client()
 
@@ -400,11 +476,13 @@ def refund_payment(creator_wallet: str, amount_algo: float) -> dict:
             "message": f"Demo mode — {amount_algo} ALGO refunded to {creator_wallet[:8]}..."
         }
 
+    submitted = False
     try:
-        from algosdk import mnemonic, transaction, account
+        from algosdk import transaction
 
-        private_key = mnemonic.to_private_key(ESCROW_MNEMONIC)
-        escrow_addr = account.address_from_private_key(private_key)
+        private_key, escrow_addr = get_escrow_keys()
+        if private_key is None:
+            raise ValueError("ESCROW_MNEMONIC is not a valid mnemonic")
 
         # Get suggested params
         params = client.suggested_params()
@@ -419,12 +497,17 @@ def refund_payment(creator_wallet: str, amount_algo: float) -> dict:
             note=b"GigBounty Refund",
         )
 
-        # Sign and send
+        # Sign, let the caller record the tx ID, then send
         signed_txn = txn.sign(private_key)
-        tx_id = client.send_transaction(signed_txn)
+        if on_signed is not None:
+            on_signed(signed_txn.get_txid(), txn.last_valid_round)
+        with tracing.span("algod.send_transaction"):
+            tx_id = client.send_transaction(signed_txn)
+        submitted = True
 
         # Wait for confirmation
-        transaction.wait_for_confirmation(client, tx_id, 4)
+        with tracing.span("algod.wait_for_confirmation", tx_id=tx_id):
+            transaction.wait_for_confirmation(client, tx_id, 4)
 
         return {
             "success": True,
@@ -435,12 +518,138 @@ def refund_payment(creator_wallet: str, amount_algo: float) -> dict:
     except Exception as e:
         return {
             "success": False,
+            "submitted": submitted,
             "tx_id": None,
             "amount": amount_algo,
             "message": f"Refund failed: {str(e)}"
         }
 
 
+# ─── Batched Refunds ─────────────────────────────────────────
+# Used for expired tasks (see expiry.py), in three steps so a refund group is
+# never sent twice: sign the group (its tx IDs are known before anything is
+# sent), let the caller record those IDs, then submit. A group that was
+# submitted is only ever re-checked by tx ID (transaction_status), never rebuilt;
+# it can be retried with new transactions once it was rejected at submit or
+# its validity window has passed unconfirmed.
+
+# Refund groups are valid for this many rounds (~3 s each) instead of the
+# default 1000, so an unconfirmed group is known to be dead within minutes
+REFUND_VALID_ROUNDS = int(os.getenv("REFUND_VALID_ROUNDS", "30"))
+
+# Rounds to wait past a transaction's last valid round before calling it expired,
+# so the Indexer has caught up with a confirmation in the final rounds
+REFUND_SETTLE_ROUNDS = 10
+
+
+def sign_refund_group(refunds: list) -> Optional[dict]:
+    """
+    Build and sign one atomic group refunding several creators.
+
+    Args:
+        refunds: Up to 16 (creator_wallet, amount_algo) pairs
+
+    Returns:
+        { signed: [SignedTransaction], tx_ids: [str], last_valid: int },
+        tx IDs in the order of `refunds`; None in demo mode.
+
+    Raises:
+        algosdk errors if suggested params cannot be fetched.
+    """
+    client = get_algod_client()
+    if not client or not ESCROW_MNEMONIC:
+        return None
+
+    from algosdk import transaction
+
+    private_key, escrow_addr = get_escrow_keys()
+    if private_key is None:
+        raise ValueError("ESCROW_MNEMONIC is not a valid mnemonic")
+
+    params = client.suggested_params()
+    params.last = params.first + REFUND_VALID_ROUNDS
+    txns = [
+        transaction.PaymentTxn(
+            sender=escrow_addr,
+            sp=params,
+            receiver=creator_wallet,
+            amt=int(amount_algo * ALGO_TO_MICROALGO),
+            note=b"GigBounty Refund",
+        )
+        for creator_wallet, amount_algo in refunds
+    ]
+    if len(txns) > 1:
+        txns = transaction.assign_group_id(txns)
+    signed = [txn.sign(private_key) for txn in txns]
+    return {"signed": signed, "tx_ids": [s.get_txid() for s in signed], "last_valid": params.last}
+
+
+@tracing.traced("escrow.submit_refund_group")
+@metrics.timed(metrics.ESCROW_CALL_DURATION, operation="submit_refund_group")
+def submit_refund_group(group: dict) -> dict:
+    """
+    Submit a signed refund group without waiting for confirmation.
+
+    Returns:
+        { submitted: bool, rejected: bool, message }. `rejected` means algod
+        refused the group, so none of it can confirm and it is safe to retry
+        with new transactions. Any other error leaves the outcome unknown;
+        follow up with transaction_status.
+    """
+    from algosdk.error import AlgodHTTPError
+
+    try:
+        with tracing.span("algod.send_transactions", size=len(group["signed"])):
+            get_algod_client().send_transactions(group["signed"])
+        return {"submitted": True, "rejected": False, "message": "Refund group submitted"}
+    except AlgodHTTPError as e:
+        return {"submitted": False, "rejected": True, "message": f"Refund rejected: {str(e)}"}
+    except Exception as e:
+        return {"submitted": False, "rejected": False, "message": f"Refund submit failed: {str(e)}"}
+
+
+@tracing.traced("escrow.transaction_status")
+def transaction_status(tx_id: Optional[str], last_valid: int) -> str:
+    """
+    Outcome of a payout or refund transaction whose tx ID was recorded
+    before it was sent (sign_refund_group, on_signed).
+
+    Args:
+        tx_id: The transaction's tx ID (None if it was never recorded as sent)
+        last_valid: Last round the group could confirm in
+
+    Returns:
+        "confirmed", "pending" (may still confirm) or "expired" (never will).
+
+    Raises:
+        algosdk errors if algod cannot be reached; the outcome is then unknown.
+    """
+    from algosdk.error import AlgodHTTPError, IndexerHTTPError
+
+    client = get_algod_client()
+    if tx_id is not None:
+        try:
+            info = client.pending_transaction_info(tx_id)
+            if info.get("confirmed-round"):
+                return "confirmed"
+            if info.get("pool-error"):
+                return "expired"  # dropped from the pool, cannot confirm
+        except AlgodHTTPError as e:
+            if e.code != 404:
+                raise
+        # Not in the node's pool any more: confirmed long ago, or never sent
+        indexer = get_indexer_client()
+        if indexer is not None:
+            try:
+                if indexer.transaction(tx_id).get("transaction", {}).get("confirmed-round"):
+                    return "confirmed"
+            except IndexerHTTPError:
+                pass
+    if client.status()["last-round"] > last_valid + REFUND_SETTLE_ROUNDS:
+        return "expired"
+    return "pending"
+
+
 # ─── Balance & Info ───────────────────────────────────────────
 
 
@@ -0,0 +1,317 @@
+"""
+Expiry Module
+Moves OPEN tasks past their deadline to EXPIRED and refunds their creators.
+
+A min-heap of (expires_at, task_id) holds every OPEN task that has a
+deadline. It is seeded once at startup from database.py's deadline index,
+then kept current from the task change feed, so the board is never
+rescanned. The scheduler sleeps until the earliest deadline passes or a
+change arrives. A deadline "YYYY-MM-DD" expires at the end of that day (UTC).
+
+Expired tasks are reserved (payout_pending) in the same compare-and-set
+that sets EXPIRED. Their refunds are queued and sent in batches of up to
+EXPIRY_REFUND_BATCH_SIZE payments per transaction group, then followed by
+tx ID until they confirm (see Batched Refunds below). A refund that still
+fails after EXPIRY_REFUND_RETRIES keeps its task EXPIRED with refund_error
+set; admins list and re-queue those via /admin/refunds.
+
+Off by default: set EXPIRY_ENABLED=true (refunds need ESCROW_MNEMONIC).
+"""
+
+import asyncio
+import heapq
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from dotenv import load_dotenv
+
+import database as db
+import escrow
+
+load_dotenv()
+
+EXPIRY_ENABLED = os.getenv("EXPIRY_ENABLED", "false").lower() == "true"
+EXPIRY_REFUND_BATCH_SIZE = min(int(os.getenv("EXPIRY_REFUND_BATCH_SIZE", "16")), 16)
+EXPIRY_REFUND_BATCH_SECONDS = float(os.getenv("EXPIRY_REFUND_BATCH_SECONDS", "2"))
+EXPIRY_REFUND_RETRIES = int(os.getenv("EXPIRY_REFUND_RETRIES", "3"))
+EXPIRY_RETRY_SECONDS = float(os.getenv("EXPIRY_RETRY_SECONDS", "30"))
+
+# How often an unconfirmed refund's tx ID is re-checked
+EXPIRY_CONFIRM_SECONDS = float(os.getenv("EXPIRY_CONFIRM_SECONDS", "4"))
+
+# With STORAGE_BACKEND=sqlite, other workers' changes only reach this
+# process's change feed on db.sync(); poll at least this often
+EXPIRY_SYNC_SECONDS = float(os.getenv("EXPIRY_SYNC_SECONDS", "30"))
+
+_heap: list = []        # [(expires_at, task_id)], may hold superseded entries
+_scheduled: dict = {}   # { task_id: expires_at } — the live entry per task
+_refunds: Optional[asyncio.Queue] = None
+_workers: list = []
+_settling: set = set()  # _settle jobs following submitted refunds
+
+
+def expires_at(deadline: Optional[str]) -> Optional[float]:
+    """Unix time a "YYYY-MM-DD" deadline passes (end of that day, UTC); None if unset or malformed."""
+    if not deadline:
+        return None
+    try:
+        day = datetime.strptime(deadline[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return (day + timedelta(days=1)).timestamp()
+
+
+def _track(task: dict):
+    """(Re)schedule a task after a change, or drop it once it is no longer OPEN."""
+    when = expires_at(task.get("deadline")) if task["status"] == "OPEN" else None
+    if when is None:
+        _scheduled.pop(task["id"], None)
+    elif _scheduled.get(task["id"]) != when:
+        _scheduled[task["id"]] = when
+        heapq.heappush(_heap, (when, task["id"]))
+
+
+def _seed():
+    """Rebuild the heap from the deadline index (startup and change-feed resyncs)."""
+    _heap.clear()
+    _scheduled.clear()
+    for deadline, task_id in db.get_open_deadlines():
+        when = expires_at(deadline)
+        if when is not None:
+            _scheduled[task_id] = when
+            _heap.append((when, task_id))
+    heapq.heapify(_heap)
+
+
+def _expire_due():
+    """Pop every entry whose time has come and expire the task it still describes."""
+    now = time.time()
+    while _heap and _heap[0][0] <= now:
+        when, task_id = heapq.heappop(_heap)
+        if _scheduled.get(task_id) != when:
+            continue  # superseded: deadline changed or task left OPEN
+        del _scheduled[task_id]
+        _expire(task_id)
+
+
+def _expire(task_id: str):
+    task = db.get_task(task_id)
+    if task is None or task["status"] != "OPEN" or task.get("payout_pending"):
+        return
+    try:
+        reserved = db.transition_task(
+            task_id, {"status": "EXPIRED", "payout_pending": True},
+            expected_status="OPEN", expected_version=task.get("version"),
+        )
+    except db.TaskConflictError:
+        return  # claimed, cancelled or expired by another worker meanwhile
+    if reserved is not None:
+        print(f"⌛ Task {task_id} expired (deadline {task['deadline']}) — refund queued")
+        _refunds.put_nowait((reserved, 0))
+
+
+# ─── Batched Refunds ──────────────────────────────────────────
+# A batch is signed first, and each task records its refund's tx ID and
+# last valid round (a compare-and-set) before the group is submitted. From
+# then on the refund is only followed up by tx ID (_settle); new refund
+# transactions are built only once the old ones were rejected at submit or
+# expired unconfirmed, so a slow confirmation never refunds anyone twice.
+# Refunds still in flight at shutdown are picked up again by _resume().
+
+
+def _retry(task: dict, attempts: int, message: str):
+    """Queue another attempt after EXPIRY_RETRY_SECONDS, or record the failure for good."""
+    if attempts + 1 < EXPIRY_REFUND_RETRIES:
+        asyncio.get_running_loop().call_later(EXPIRY_RETRY_SECONDS, _refunds.put_nowait, (task, attempts + 1))
+        return
+    print(f"⚠️  Refund for expired task {task['id']} failed: {message}")
+    _finish(task, {"payout_pending": False, "refund_error": message})
+
+
+def _finish(task: dict, updates: dict):
+    try:
+        db.transition_task(task["id"], updates, expected_version=task["version"])
+    except db.TaskConflictError as e:
+        print(f"⚠️  Could not record refund for expired task {task['id']}: {e}")
+
+
+async def _collect_refunds() -> list:
+    loop = asyncio.get_running_loop()
+    batch = [await _refunds.get()]
+    flush_at = loop.time() + EXPIRY_REFUND_BATCH_SECONDS
+    while len(batch) < EXPIRY_REFUND_BATCH_SIZE:
+        remaining = flush_at - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(_refunds.get(), timeout=remaining))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+async def _send_batch(batch: list):
+    refunds = [(task["creator_wallet"], task["amount"]) for task, _ in batch]
+    try:
+        group = await asyncio.to_thread(escrow.sign_refund_group, refunds)
+    except Exception as e:
+        for task, attempts in batch:
+            _retry(task, attempts, f"Refund failed: {e}")
+        return
+
+    if group is None:
+        # Demo mode — nothing reaches the chain
+        for task, _ in batch:
+            refund = escrow.refund_payment(task["creator_wallet"], task["amount"])
+            _finish(task, {"payout_pending": False, "tx_id": refund["tx_id"]})
+        return
+
+    # Record every tx ID before anything is sent; a conflict means another
+    # worker took the task over, so the group must not go out at all
+    recorded = []
+    conflicted = False
+    for (task, attempts), tx_id in zip(batch, group["tx_ids"]):
+        try:
+            task = db.transition_task(
+                task["id"], {"refund_tx_id": tx_id, "refund_last_valid": group["last_valid"]},
+                expected_version=task["version"],
+            )
+        except db.TaskConflictError:
+            conflicted = True
+            continue
+        recorded.append((task, attempts))
+    if conflicted:
+        # Never submitted: these expire after last_valid and are retried then
+        for task, attempts in recorded:
+            _spawn(_settle(task, attempts))
+        return
+
+    submit = await asyncio.to_thread(escrow.submit_refund_group, group)
+    for task, attempts in recorded:
+        if submit["rejected"]:
+            _retry(task, attempts, submit["message"])
+        else:
+            _spawn(_settle(task, attempts))
+
+
+async def _settle(task: dict, attempts: int = 0):
+    """Follow a recorded refund by tx ID until it confirms or can no longer confirm."""
+    while True:
+        try:
+            status = await asyncio.to_thread(
+                escrow.transaction_status, task.get("refund_tx_id"), task["refund_last_valid"]
+            )
+        except Exception as e:
+            print(f"⚠️  Refund status lookup for task {task['id']} failed: {e}")
+            status = "pending"
+        if status == "confirmed":
+            _finish(task, {"payout_pending": False, "tx_id": task["refund_tx_id"], "refund_error": None})
+            return
+        if status == "expired":
+            _retry(task, attempts, f"Refund {task.get('refund_tx_id')} expired unconfirmed")
+            return
+        await asyncio.sleep(EXPIRY_CONFIRM_SECONDS)
+
+
+def _resume():
+    """Pick up refunds left in flight by a previous run (reserved, no tx_id yet)."""
+    for task in db.get_all_tasks():
+        if task["status"] != "EXPIRED" or not task.get("payout_pending") or task.get("tx_id"):
+            continue
+        if task.get("refund_last_valid") is not None:
+            _spawn(_settle(dict(task)))
+        else:
+            _refunds.put_nowait((dict(task), 0))
+
+
+def _refund_failed(task: dict) -> bool:
+    return (task["status"] == "EXPIRED" and bool(task.get("refund_error"))
+            and not task.get("payout_pending") and not task.get("tx_id"))
+
+
+def failed_refunds() -> list:
+    """Expired tasks whose refund gave up after EXPIRY_REFUND_RETRIES (refund_error set, no tx_id)."""
+    return [task for task in db.get_all_tasks() if _refund_failed(task)]
+
+
+def retry_refund(task_id: str) -> dict:
+    """
+    Queue a failed refund again (POST /admin/refunds/{task_id}/retry).
+
+    Returns:
+        The task, reserved again (payout_pending) with refund_error cleared.
+
+    Raises:
+        ValueError if the scheduler is not running or the task has no failed refund.
+        database.TaskConflictError if the task changed meanwhile.
+    """
+    if _refunds is None or not _workers:
+        raise ValueError("The expiry scheduler is not running (EXPIRY_ENABLED=false)")
+    task = db.get_task(task_id)
+    if task is None or not _refund_failed(task):
+        raise ValueError(f"Task {task_id} has no failed refund to retry")
+    reserved = db.transition_task(
+        task_id, {"payout_pending": True, "refund_error": None},
+        expected_status="EXPIRED", expected_version=task["version"],
+    )
+    _refunds.put_nowait((reserved, 0))
+    return reserved
+
+
+def _spawn(coro):
+    job = asyncio.create_task(coro)
+    _settling.add(job)
+    job.add_done_callback(_settling.discard)
+
+
+async def _refund_loop():
+    while True:
+        await _send_batch(await _collect_refunds())
+
+
+# ─── Scheduler ────────────────────────────────────────────────
+
+
+async def _schedule_loop():
+    await asyncio.to_thread(db.load)
+    queue = db.subscribe(maxsize=10000)
+    try:
+        _seed()
+        _resume()
+        while True:
+            timeout = max(0.0, _heap[0][0] - time.time()) if _heap else None
+            if db.SHARED_STORAGE:
+                timeout = EXPIRY_SYNC_SECONDS if timeout is None else min(timeout, EXPIRY_SYNC_SECONDS)
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                db.sync()
+                _expire_due()
+                continue
+            if event["type"] == "resync":
+                _seed()
+            elif event["type"] == "deleted":
+                _scheduled.pop(event["task"]["id"], None)
+            else:
+                _track(event["task"])
+            _expire_due()
+    finally:
+        db.unsubscribe(queue)
+
+
+def start():
+    """Start the scheduler and refund worker on the running loop (app startup)."""
+    global _refunds
+    if not EXPIRY_ENABLED or _workers:
+        return
+    _refunds = asyncio.Queue()
+    _workers.extend([asyncio.create_task(_schedule_loop()), asyncio.create_task(_refund_loop())])
+
+
+def stop():
+    """Cancel the scheduler (app shutdown). Refunds in flight are resumed by the next start()."""
+    for worker in [*_workers, *_settling]:
+        worker.cancel()
+    _workers.clear()
+    _settling.clear()
@@ -0,0 +1,250 @@
+"""
+GigBounty — Offline Fake GitHub + Gemini APIs
+
+A local stand-in for the two external APIs used by ai_verify.py, so the AI
+pipeline can be benchmarked and regression-tested without network access
+or a GEMINI_API_KEY.
+
+USAGE:
+  1. Start the fake server:
+       python fake_services.py --port 8099 --latency-ms 40 --error-rate 0.05
+  2. Point ai_verify.py at it (e.g. in .env):
+       GITHUB_API_URL=http://127.0.0.1:8099
+       GEMINI_API_BASE=http://127.0.0.1:8099/v1beta
+       GEMINI_API_KEY=fake
+
+Canned repos are served under https://github.com/fake/<name> proof URLs:
+  - fake/todo-app      React app with README, manifests, source files
+  - fake/flask-api     Python API with requirements.txt and tests
+  - fake/empty-repo    Exists but has no commits (pre-screen: empty_repo)
+  - fake/readme-only   Only a README (pre-screen flag: only_boilerplate_files)
+  - anything else      404 (pre-screen: repo_not_found)
+
+Injected latency is uniform in [latency_ms/2, latency_ms*1.5]; a fraction
+`error_rate` of requests fail with 503 (GitHub and Gemini alike), or with
+429 when `--rate-limit` is set.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+
+_README_TODO = """# Todo App
+
+A flat-design todo list built with React and Vite.
+
+## Features
+- Add, edit and delete todos
+- Filter by status
+- Persists to localStorage
+
+## Setup
+npm install
+npm run dev
+
+## Testing
+npm test
+"""
+
+_README_FLASK = """# Flask API
+
+REST API for managing bounties.
+
+## Endpoints
+- GET /tasks
+- POST /tasks
+
+## Running
+pip install -r requirements.txt
+flask run
+"""
+
+CANNED_REPOS = {
+    "todo-app": {
+        "repo": {
+            "full_name": "fake/todo-app", "description": "Flat design todo app",
+            "language": "JavaScript", "stargazers_count": 3, "forks_count": 1,
+            "created_at": "2025-01-10T09:00:00Z", "updated_at": "2025-01-12T18:00:00Z",
+            "size": 412, "topics": ["react", "todo"], "default_branch": "main",
+        },
+        "languages": {"JavaScript": 18234, "CSS": 4211, "HTML": 512},
+        "tree": [
+            "package.json", "vite.config.js", "index.html", "README.md",
+            "src/main.jsx", "src/App.jsx", "src/components/TodoList.jsx",
+            "src/components/TodoItem.jsx", "src/components/FilterBar.jsx",
+            "src/styles/flat.css", "src/hooks/useLocalStorage.js",
+            "tests/TodoList.test.jsx",
+        ] + [f"public/icons/icon-{i}.svg" for i in range(60)],
+        "readme": _README_TODO,
+    },
+    "flask-api": {
+        "repo": {
+            "full_name": "fake/flask-api", "description": "Bounty REST API",
+            "language": "Python", "stargazers_count": 0, "forks_count": 0,
+            "created_at": "2025-02-01T10:00:00Z", "updated_at": "2025-02-03T10:00:00Z",
+            "size": 96, "topics": [], "default_branch": "main",
+        },
+        "languages": {"Python": 9120, "Dockerfile": 210},
+        "tree": [
+            "requirements.txt", "Dockerfile", "README.md", "app/__init__.py",
+            "app/routes.py", "app/models.py", "tests/test_routes.py",
+        ],
+        "readme": _README_FLASK,
+    },
+    "empty-repo": {
+        "repo": {
+            "full_name": "fake/empty-repo", "description": None, "language": None,
+            "created_at": "2025-03-01T10:00:00Z", "updated_at": "2025-03-01T10:00:00Z",
+            "size": 0, "default_branch": "main",
+        },
+        "languages": {},
+        "tree": None,
+        "readme": None,
+    },
+    "readme-only": {
+        "repo": {
+            "full_name": "fake/readme-only", "description": "Coming soon", "language": None,
+            "created_at": "2025-03-02T10:00:00Z", "updated_at": "2025-03-02T10:00:00Z",
+            "size": 1, "default_branch": "main",
+        },
+        "languages": {},
+        "tree": ["README.md"],
+        "readme": "# Coming soon\n",
+    },
+}
+
+# Canned Gemini verdict — the benchmark measures the pipeline, not the judgement
+_GEMINI_VERDICT = {
+    "score": 0.82,
+    "verdict": "PASS",
+    "reasoning": "Fake Gemini: repository appears to cover the task.",
+    "audit_report": "## Completeness\n- Fake audit report generated offline.",
+}
+
+
+def create_app(latency_ms: float = 0.0, error_rate: float = 0.0,
+               rate_limit: bool = False, seed: int = None) -> FastAPI:
+    """Build the fake API app with the given latency/error injection."""
+    app = FastAPI(title="GigBounty Fake External APIs")
+    rng = random.Random(seed)
+    stats = {"github": 0, "github_304": 0, "gemini": 0, "errors": 0}
+
+    async def inject():
+        """Sleep for the injected latency; maybe return an error response."""
+        if latency_ms:
+            await asyncio.sleep(rng.uniform(latency_ms / 2, latency_ms * 1.5) / 1000)
+        if error_rate and rng.random() < error_rate:
+            stats["errors"] += 1
+            if rate_limit:
+                return JSONResponse({"message": "rate limited"}, status_code=429, headers={"Retry-After": "1"})
+            return JSONResponse({"message": "injected failure"}, status_code=503)
+        return None
+
+    def github_json(request: Request, payload) -> Response:
+        """200 with an ETag, or 304 if the client already has this version."""
+        body = json.dumps(payload).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            stats["github_304"] += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    def lookup(owner: str, repo: str):
+        if owner != "fake":
+            return None
+        return CANNED_REPOS.get(repo)
+
+    def not_found() -> JSONResponse:
+        return JSONResponse({"message": "Not Found"}, status_code=404)
+
+    @app.get("/repos/{owner}/{repo}")
+    async def repo_info(owner: str, repo: str, request: Request):
+        stats["github"] += 1
+        if (err := await inject()) is not None:
+            return err
+        canned = lookup(owner, repo)
+        return github_json(request, canned["repo"]) if canned else not_found()
+
+    @app.get("/repos/{owner}/{repo}/languages")
+    async def languages(owner: str, repo: str, request: Request):
+        stats["github"] += 1
+        if (err := await inject()) is not None:
+            return err
+        canned = lookup(owner, repo)
+        return github_json(request, canned["languages"]) if canned else not_found()
+
+    @app.get("/repos/{owner}/{repo}/git/trees/{branch}")
+    async def tree(owner: str, repo: str, branch: str, request: Request):
+        stats["github"] += 1
+        if (err := await inject()) is not None:
+            return err
+        canned = lookup(owner, repo)
+        if not canned or branch != canned["repo"]["default_branch"]:
+            return not_found()
+        if canned["tree"] is None:
+            return JSONResponse({"message": "Git Repository is empty."}, status_code=409)
+        entries = []
+        dirs = set()
+        for path in canned["tree"]:
+            parts = path.split("/")
+            for i in range(1, len(parts)):
+                d = "/".join(parts[:i])
+                if d not in dirs:
+                    dirs.add(d)
+                    entries.append({"path": d, "type": "tree"})
+            entries.append({"path": path, "type": "blob"})
+        return github_json(request, {"sha": "fake", "tree": entries, "truncated": False})
+
+    @app.get("/repos/{owner}/{repo}/readme")
+    async def readme(owner: str, repo: str, request: Request):
+        stats["github"] += 1
+        if (err := await inject()) is not None:
+            return err
+        canned = lookup(owner, repo)
+        if not canned or not canned["readme"]:
+            return not_found()
+        content = base64.b64encode(canned["readme"].encode()).decode()
+        return github_json(request, {"name": "README.md", "encoding": "base64", "content": content})
+
+    @app.post("/v1beta/models/{model}:generateContent")
+    async def generate_content(model: str, request: Request):
+        stats["gemini"] += 1
+        await request.body()
+        if (err := await inject()) is not None:
+            return err
+        return {
+            "candidates": [
+                {"content": {"parts": [{"text": json.dumps(_GEMINI_VERDICT)}]}}
+            ]
+        }
+
+    @app.get("/_stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake GitHub + Gemini APIs for offline runs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mean injected latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--rate-limit", action="store_true", help="inject 429s instead of 503s")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(args.latency_ms, args.error_rate, args.rate_limit, args.seed),
+        host=args.host, port=args.port, log_level="warning",
+    )
@@ -4,24 +4,115 @@ Decentralized Micro-Task Bounty Board
 """
 
 import os
-from fastapi import FastAPI, HTTPException, Depends, Request
+import json
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, Query
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
 from models import (
     TaskCreate, TaskClaim, TaskSubmitProof,
-    TaskApprove, TaskRelease, TaskCancel, TaskDispute, TaskResponse
+    TaskApprove, TaskRelease, TaskCancel, TaskDispute, TaskResponse, WalletLogin,
+    normalize_deadline,
 )
+import ai_verify
+import app_factory
+import auth
+import chain_state
 import database as db
+import escrow
+import expiry
+import metrics
+import payouts
+import profiler
+import tracing
 from escrow import verify_payment, release_payment, refund_payment, get_escrow_info
 from ai_verify import verify_proof
-from auth import get_authenticated_wallet, require_wallet_ownership
+from auth import (
+    get_authenticated_wallet, require_wallet_ownership, issue_challenge,
+    is_valid_wallet_address, verify_signed_challenge, issue_session_token, require_admin
+)
 
 load_dotenv()
 
+# Seconds between SSE heartbeat comments on /tasks/stream
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+# How often an idle stream checks the shared store for other workers' writes
+# (STORAGE_BACKEND=sqlite only)
+SSE_SYNC_SECONDS = float(os.getenv("SSE_SYNC_SECONDS", "1"))
+
+# Responses at least this many bytes are gzip-compressed for clients that accept it
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+# ─── Startup Warm-up ──────────────────────────────────────────
+# Importing the app loads nothing from disk and imports no SDKs, so a cold
+# start binds its port quickly. Startup then launches the warm-up in the
+# background (uvicorn binds only once startup returns) and runs its steps
+# in parallel threads. GET /ready is 503 until every step has finished;
+# requests arriving earlier load what they need on first use.
+
+_warmup: dict = {"status": "starting", "total_ms": None, "steps": {}}
+
+
+def _warm_up_step(name: str, fn, *args):
+    started = time.perf_counter()
+    try:
+        fn(*args)
+        _warmup["steps"][name] = {"ok": True, "ms": round((time.perf_counter() - started) * 1000, 1)}
+    except Exception as e:
+        _warmup["steps"][name] = {
+            "ok": False, "ms": round((time.perf_counter() - started) * 1000, 1), "error": str(e),
+        }
+
+
+async def _warm_up():
+    """Load tasks/roles, derive the escrow key, build algod/indexer/HTTP clients, import crypto libs."""
+    started = time.perf_counter()
+    steps = {
+        "database": (db.load,),
+        "escrow": (escrow.warm_up,),
+        "auth": (auth.warm_up,),
+        "http_client": (ai_verify.get_http_client, asyncio.get_running_loop()),
+    }
+    await asyncio.gather(*(
+        asyncio.to_thread(_warm_up_step, name, *step) for name, step in steps.items()
+    ))
+    failed = [name for name, step in _warmup["steps"].items() if not step["ok"]]
+    _warmup["status"] = "failed" if failed else "ready"
+    _warmup["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    timings = ", ".join(f"{name} {step['ms']} ms" for name, step in _warmup["steps"].items())
+    if failed:
+        print(f"❌ Warm-up failed ({', '.join(failed)}) after {_warmup['total_ms']} ms — {timings}")
+    else:
+        print(f"✅ Warm-up done in {_warmup['total_ms']} ms — {timings}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up = asyncio.create_task(_warm_up())
+    app_factory.start()
+    expiry.start()
+    payouts.start()
+    yield
+    payouts.stop()
+    expiry.stop()
+    app_factory.stop()
+    warm_up.cancel()
+    await ai_verify.close_http_client()
+
+
 app = FastAPI(
     title="GigBounty API",
     description="Decentralized Micro-Task Bounty Board API",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
 )
 
 # CORS — use env variable or defaults
@@ -34,14 +125,294 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id"],
 )
 
 
+class _GZipExceptStreams(GZipMiddleware):
+    """GZip responses, except the SSE stream (gzip would hold events back in its buffer)."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/tasks/stream":
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app.add_middleware(_GZipExceptStreams, minimum_size=GZIP_MIN_SIZE, compresslevel=GZIP_LEVEL)
+
+
+class _RequestMetrics:
+    """
+    Observe time to response start per route template and status code.
+    Added last so it wraps the other middleware (gzip time included).
+    Unmatched paths share one label to keep the series count bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                metrics.HTTP_REQUEST_DURATION.observe(
+                    time.perf_counter() - started,
+                    method=scope["method"],
+                    route=route.path if route is not None else "unmatched",
+                    status=message["status"],
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class _RequestTracing:
+    """
+    Root span per request (continuing an incoming `traceparent`); the trace ID
+    is returned in X-Trace-Id so a slow response can be found in the export.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        traceparent = dict(scope["headers"]).get(b"traceparent", b"").decode("latin-1")
+        root = tracing.start_trace(f"{scope['method']} {scope['path']}", traceparent, **{
+            "http.method": scope["method"], "http.target": scope["path"],
+        })
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                if route is not None:
+                    root.name = f"{scope['method']} {route.path}"
+                    root.set_attribute("http.route", route.path)
+                root.set_attribute("http.status_code", message["status"])
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", root.trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with root:
+            await self.app(scope, receive, send_wrapper)
+
+
+app.add_middleware(_RequestTracing)
+app.add_middleware(_RequestMetrics)
+
+
+def _fields(fields: Optional[str], view: Optional[str]) -> Optional[tuple]:
+    """Validate ?fields= / ?view= into a projection (400 on unknown names)."""
+    try:
+        return db.resolve_fields(fields, view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _transition(task: dict, updates: dict) -> dict:
+    """
+    Compare-and-set the task from the status/version we read to `updates`.
+    A concurrent writer (or a payout in flight) surfaces as 409 Conflict.
+    """
+    if task.get("payout_pending"):
+        raise HTTPException(status_code=409, detail="A payout for this task is already in progress")
+    try:
+        updated = db.transition_task(
+            task["id"], updates,
+            expected_status=task["status"],
+            expected_version=task.get("version"),
+        )
+    except db.TaskConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    chain_state.invalidate(task.get("app_id"))
+    return updated
+
+
+def _pay_out(task: dict, send_payment, final_status: str) -> tuple:
+    """
+    Reserve the task, run the payment, then finish the transition.
+
+    The reservation (payout_pending) is itself a compare-and-set, so of two
+    concurrent approve/release/cancel calls only one ever reaches the chain.
+    The payment's tx ID is recorded before it is sent; a payment that was
+    sent but not confirmed keeps the reservation, and payouts.py settles it
+    by that tx ID later (as it does after a crash).
+
+    Args:
+        task: The task as read by the handler
+        send_payment: Callable(on_signed) returning the escrow result dict
+        final_status: Status the task moves to once paid
+
+    Returns:
+        (updated_task or None, escrow_result) — the task is None if payment failed.
+    """
+    with tracing.span("payout.reserve", task_id=task["id"]):
+        reserved = _transition(task, payouts.reservation(final_status))
+
+    def on_signed(tx_id: str, last_valid: int):
+        nonlocal reserved
+        reserved = _finish_payout(reserved, {"payout_tx_id": tx_id, "payout_last_valid": last_valid})
+
+    with tracing.span("payout.send", task_id=task["id"]) as span:
+        try:
+            result = send_payment(on_signed)
+        except Exception as e:
+            print(f"❌ Payout for task {task['id']} raised: {e}")
+            result = {"success": False, "submitted": reserved.get("payout_tx_id") is not None,
+                      "message": f"Payment failed: {e}"}
+        span.set_attribute("success", result["success"])
+
+    with tracing.span("payout.finalize", task_id=task["id"]):
+        if not result["success"]:
+            if result.get("submitted"):
+                result["message"] += " — the payment may still confirm; the task stays reserved until it settles"
+            else:
+                _finish_payout(reserved, payouts.RELEASED)
+            return None, result
+
+        updated = _finish_payout(reserved, {**payouts.RELEASED, "status": final_status, "tx_id": result["tx_id"]})
+    chain_state.invalidate(task.get("app_id"))
+    return updated, result
+
+
+def _finish_payout(reserved: dict, updates: dict) -> Optional[dict]:
+    """
+    Apply a payout's final updates to the task reserved for it.
+
+    The reservation already keeps other payers out, so if some other write
+    bumped the version meanwhile the updates are applied by task_id anyway —
+    the payment has happened and must not surface as a conflict.
+    """
+    try:
+        return db.transition_task(reserved["id"], updates, expected_version=reserved["version"])
+    except db.TaskConflictError as e:
+        print(f"⚠️  Task {reserved['id']} changed during its payout ({e}); applying the result anyway")
+        return db.update_task(reserved["id"], updates)
+
+
 @app.get("/")
 async def root():
     return {"message": "GigBounty API is running", "version": "2.0.0"}
 
 
+# ─── GET /ready ───────────────────────────────────────────────
+@app.get("/ready")
+async def ready():
+    """
+    Readiness probe: 200 once the startup warm-up has finished, 503 before
+    (or if a step failed), with per-step timings. GET / is the liveness check.
+    """
+    return JSONResponse(_warmup, status_code=200 if _warmup["status"] == "ready" else 503)
+
+
+# ─── GET /metrics ─────────────────────────────────────────────
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text-format metrics: request, storage, escrow and AI latencies, cache hits."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# ─── GET /admin/profile ───────────────────────────────────────
+@app.get("/admin/profile")
+async def admin_profile(
+    request: Request,
+    seconds: float = Query(5, gt=0, le=60),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+):
+    """
+    Sample the live event loop for `seconds` and report where it spent time.
+    Requires PROFILER_ENABLED=true and X-Admin-Token: <ADMIN_API_TOKEN>.
+
+    format=collapsed returns flamegraph-compatible collapsed stacks as text;
+    json adds the blocking-call report and longest loop stall.
+    """
+    if not profiler.PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    require_admin(request)
+
+    loop_thread = threading.get_ident()
+    try:
+        report = await asyncio.to_thread(profiler.sample, loop_thread, seconds, interval_ms / 1000)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "collapsed":
+        return PlainTextResponse(report["collapsed"] + "\n")
+    return report
+
+
+# ─── GET /admin/refunds ───────────────────────────────────────
+@app.get("/admin/refunds", response_model=list[TaskResponse])
+async def admin_failed_refunds(request: Request):
+    """
+    Expired tasks whose refund failed after every retry (refund_error set).
+    Requires X-Admin-Token: <ADMIN_API_TOKEN>.
+    """
+    require_admin(request)
+    return expiry.failed_refunds()
+
+
+# ─── POST /admin/refunds/{task_id}/retry ──────────────────────
+@app.post("/admin/refunds/{task_id}/retry", response_model=TaskResponse)
+async def admin_retry_refund(task_id: str, request: Request):
+    """Queue a failed refund again. Requires X-Admin-Token: <ADMIN_API_TOKEN>."""
+    require_admin(request)
+    try:
+        return expiry.retry_refund(task_id)
+    except (ValueError, db.TaskConflictError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+# ─── GET /admin/payouts ───────────────────────────────────────
+@app.get("/admin/payouts")
+async def admin_stuck_payouts(request: Request):
+    """
+    Tasks reserved for a payout longer than PAYOUT_STALE_SECONDS, with the
+    payout's recorded tx ID. Requires X-Admin-Token: <ADMIN_API_TOKEN>.
+    """
+    require_admin(request)
+    return [
+        {
+            "task": TaskResponse.model_validate(task),
+            "payout_status": task.get("payout_status"),
+            "payout_tx_id": task.get("payout_tx_id"),
+            "payout_reserved_at": task.get("payout_reserved_at"),
+        }
+        for task in payouts.stuck_payouts()
+    ]
+
+
+# ─── POST /admin/payouts/{task_id}/settle ─────────────────────
+@app.post("/admin/payouts/{task_id}/settle")
+async def admin_settle_payout(task_id: str, request: Request):
+    """
+    Settle a stuck payout now: finish the transition if its tx confirmed, or
+    clear the reservation if nothing was sent or the tx expired, so the
+    payment can be retried. 409 while the tx may still confirm.
+    Requires X-Admin-Token: <ADMIN_API_TOKEN>.
+    """
+    require_admin(request)
+    try:
+        outcome, task = await payouts.settle(task_id)
+    except (ValueError, db.TaskConflictError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Could not check the payout on chain: {e}")
+    if outcome == "pending":
+        raise HTTPException(status_code=409, detail=f"Payout {task['payout_tx_id']} may still confirm — try again later")
+    return {"outcome": outcome, "task": TaskResponse.model_validate(task)}
+
+
 # ─── GET /escrow/info ─────────────────────────────────────────
 @app.get("/escrow/info")
 async def escrow_info():
@@ -49,6 +420,29 @@ async def escrow_info():
     return get_escrow_info()
 
 
+# ─── GET /auth/challenge ──────────────────────────────────────
+@app.get("/auth/challenge")
+async def auth_challenge(wallet: str, request: Request):
+    """
+    Issue a single-use nonce message for the wallet to sign.
+    Send the signed message back in X-Wallet-Message with X-Wallet-Signature.
+    """
+    if not is_valid_wallet_address(wallet):
+        raise HTTPException(status_code=400, detail="Invalid Algorand wallet address")
+    return issue_challenge(wallet, request.client.host if request.client else "")
+
+
+# ─── POST /auth/login ─────────────────────────────────────────
+@app.post("/auth/login")
+async def auth_login(data: WalletLogin):
+    """
+    Verify one signed challenge and issue a short-lived session token.
+    Send it as `Authorization: Bearer <token>` instead of signing every request.
+    """
+    verify_signed_challenge(data.wallet_address, data.signature, data.message)
+    return issue_session_token(data.wallet_address)
+
+
 # ─── GET /wallet/{address}/role ───────────────────────────────
 @app.get("/wallet/{address}/role")
 async def get_role(address: str):
@@ -74,19 +468,162 @@ async def set_role(request: Request):
 
 # ─── GET /tasks ───────────────────────────────────────────────
 @app.get("/tasks", response_model=list[TaskResponse])
-async def get_tasks():
-    """Get all tasks, newest first."""
-    return db.get_all_tasks()
+async def get_tasks(
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    deadline_after: Optional[str] = None,
+    deadline_before: Optional[str] = None,
+    sort: str = "-created_at",
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    chain: bool = False,
+):
+    """
+    Get all tasks, newest first by default.
+    Served from pre-serialized JSON — tasks were validated when written.
+
+    Optional filters (inclusive, answered from sorted indexes):
+        min_amount / max_amount: bounty range in ALGO
+        deadline_after / deadline_before: YYYY-MM-DD deadline range
+        sort: created_at | amount | deadline, prefix "-" for descending
+
+    Projection (also on /tasks/search and /tasks/changes):
+        fields: Comma-separated TaskResponse fields to return (id is always included)
+        view: "summary" for the board card fields without long text, or "full"
+
+    On-chain state:
+        chain: true adds "chain" to each task — its escrow app's global state
+               ({ status, amount, deadline, creator, worker, round }), or null
+               if the task has no app or algod is unavailable
+    """
+    if sort not in db.SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(db.SORT_FIELDS)}")
+    try:
+        # Compared as strings against the index, so "2026-1-31" must not slip through
+        deadline_after = normalize_deadline(deadline_after)
+        deadline_before = normalize_deadline(deadline_before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    body = db.query_tasks_json(
+        min_amount=min_amount,
+        max_amount=max_amount,
+        deadline_after=deadline_after,
+        deadline_before=deadline_before,
+        sort=sort,
+        fields=_fields(fields, view),
+    )
+    if not chain:
+        return Response(content=body, media_type="application/json")
+
+    tasks = json.loads(body)
+    app_ids = db.get_app_ids(t["id"] for t in tasks)
+    states = await chain_state.get_app_states(list(app_ids.values()))
+    for t in tasks:
+        t["chain"] = states.get(app_ids.get(t["id"]))
+    return JSONResponse(tasks)
+
+
+# ─── GET /tasks/search ────────────────────────────────────────
+@app.get("/tasks/search")
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    status: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+):
+    """
+    Keyword search over task titles and descriptions, ranked by BM25.
+    `status` filters by one or more comma-separated statuses.
+    """
+    return Response(
+        content=db.search_tasks_json(q, status=status, limit=limit, offset=offset,
+                                     fields=_fields(fields, view)),
+        media_type="application/json",
+    )
+
+
+# ─── GET /tasks/changes ───────────────────────────────────────
+@app.get("/tasks/changes")
+async def get_task_changes(since: int = 0, fields: Optional[str] = None, view: Optional[str] = None):
+    """
+    Delta sync: tasks created/updated since change `since`, plus tombstones for
+    deleted tasks and the new high-water `version` to send next time.
+    `full: true` means the delta was unavailable and `tasks` is the whole board.
+    """
+    return Response(content=db.get_changes_json(since, _fields(fields, view)), media_type="application/json")
+
+
+# ─── GET /tasks/stream ────────────────────────────────────────
+@app.get("/tasks/stream")
+async def stream_tasks(request: Request, status: Optional[str] = None, wallet: Optional[str] = None):
+    """
+    Server-Sent Events stream of task create/update/delete events.
+
+    Query params:
+        status: Comma-separated statuses; an update is sent if the task's new
+                or previous status matches (so clients see tasks leave the filter)
+        wallet: Only tasks where this wallet is the creator or the worker
+
+    Each event's `id` is the change sequence number. A `resync` event means
+    the client fell behind and should re-fetch GET /tasks. A comment line is
+    sent every SSE_HEARTBEAT_SECONDS to keep proxies from closing the connection.
+    """
+    statuses = {s.strip().upper() for s in status.split(",") if s.strip()} if status else None
+    queue = db.subscribe()
+
+    def matches(event: dict) -> bool:
+        task = event["task"]
+        if task is None:
+            return True
+        if statuses and task["status"] not in statuses and event["prev_status"] not in statuses:
+            return False
+        if wallet and wallet not in (task.get("creator_wallet"), task.get("worker_wallet")):
+            return False
+        return True
+
+    wait = min(SSE_SYNC_SECONDS, SSE_HEARTBEAT_SECONDS) if db.SHARED_STORAGE else SSE_HEARTBEAT_SECONDS
+
+    async def events():
+        try:
+            yield b"retry: 3000\n\n"
+            idle = 0.0
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=wait)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Pull changes committed by other workers onto the queue
+                    db.sync()
+                    idle += wait
+                    if idle >= SSE_HEARTBEAT_SECONDS:
+                        idle = 0.0
+                        yield b": heartbeat\n\n"
+                    continue
+                if matches(event):
+                    yield b"id: %d\nevent: %s\ndata: %s\n\n" % (
+                        event["seq"], event["type"].encode(), event["data"]
+                    )
+        finally:
+            db.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # ─── GET /tasks/{task_id} ─────────────────────────────────────
 @app.get("/tasks/{task_id}", response_model=TaskResponse)
 async def get_task(task_id: str):
     """Get a single task by ID."""
-    task = db.get_task(task_id)
-    if not task:
+    body = db.get_task_json(task_id)
+    if body is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    return Response(content=body, media_type="application/json")
 
 
 # ─── POST /task/create ────────────────────────────────────────
@@ -113,8 +650,10 @@ async def create_task(
     )
 
     # Store transaction ID
-    db.update_task(task["id"], {"tx_id": payment["tx_id"]})
-    task["tx_id"] = payment["tx_id"]
+    task = db.update_task(task["id"], {"tx_id": payment["tx_id"]})
+
+    # Per-task escrow app, deployed in the background (ESCROW_APPS_ENABLED)
+    app_factory.enqueue(task)
 
     return task
 
@@ -140,7 +679,7 @@ async def claim_task(
     if task["creator_wallet"] == data.worker_wallet:
         raise HTTPException(status_code=400, detail="Cannot claim your own task")
 
-    updated = db.update_task(data.task_id, {
+    updated = _transition(task, {
         "worker_wallet": data.worker_wallet,
         "status": "CLAIMED"
     })
@@ -160,22 +699,28 @@ async def submit_proof(data: TaskSubmitProof):
     if task["status"] != "CLAIMED":
         raise HTTPException(status_code=400, detail=f"Task is not claimed (status: {task['status']})")
 
-    updated = db.update_task(data.task_id, {
+    updated = _transition(task, {
         "proof_url": data.proof_url,
         "status": "SUBMITTED"
     })
 
     # Optional: AI auto-verification
     if data.ai_verify:
-        ai_result = await verify_proof(task["description"], data.proof_url)
+        ai_result = await verify_proof(task["description"], data.proof_url, task.get("deadline"))
         if ai_result["verdict"] == "PASS":
-            # Auto-approve and release payment
-            payout = release_payment(task["worker_wallet"], task["amount"])
-            if payout["success"]:
-                updated = db.update_task(data.task_id, {
-                    "status": "COMPLETED",
-                    "tx_id": payout["tx_id"]
-                })
+            # Auto-approve and release payment — only if nothing changed while we awaited
+            submitted = updated
+            try:
+                completed, _ = _pay_out(
+                    submitted,
+                    lambda on_signed: release_payment(submitted["worker_wallet"], submitted["amount"], on_signed),
+                    "COMPLETED",
+                )
+            except HTTPException:
+                # Task moved on meanwhile (e.g. disputed or approved) — leave it be
+                completed = None
+            if completed:
+                updated = completed
 
     return updated
 
@@ -202,16 +747,15 @@ async def approve_task(
         raise HTTPException(status_code=400, detail="No worker assigned")
 
     # Release payment from escrow
-    payout = release_payment(task["worker_wallet"], task["amount"])
+    updated, payout = _pay_out(
+        task,
+        lambda on_signed: release_payment(task["worker_wallet"], task["amount"], on_signed),
+        "COMPLETED",
+    )
 
     if not payout["success"]:
         raise HTTPException(status_code=500, detail=payout["message"])
 
-    updated = db.update_task(data.task_id, {
-        "status": "COMPLETED",
-        "tx_id": payout["tx_id"]
-    })
-
     return updated
 
 
@@ -245,16 +789,15 @@ async def cancel_task(
         )
 
     # Refund the creator
-    refund = refund_payment(task["creator_wallet"], task["amount"])
+    updated, refund = _pay_out(
+        task,
+        lambda on_signed: refund_payment(task["creator_wallet"], task["amount"], on_signed),
+        "CANCELLED",
+    )
 
     if not refund["success"]:
         raise HTTPException(status_code=500, detail=refund["message"])
 
-    updated = db.update_task(data.task_id, {
-        "status": "CANCELLED",
-        "tx_id": refund.get("tx_id")
-    })
-
     return updated
 
 
@@ -290,7 +833,7 @@ async def dispute_task(
             detail=f"Cannot dispute — task is {task['status']}. Only CLAIMED or SUBMITTED tasks can be disputed."
         )
 
-    updated = db.update_task(data.task_id, {
+    updated = _transition(task, {
         "status": "DISPUTED",
         "dispute_reason": data.reason,
         "disputed_by": data.caller_wallet,
@@ -320,16 +863,15 @@ async def release_task_payment(
     if not task["worker_wallet"]:
         raise HTTPException(status_code=400, detail="No worker assigned")
 
-    payout = release_payment(task["worker_wallet"], task["amount"])
+    updated, payout = _pay_out(
+        task,
+        lambda on_signed: release_payment(task["worker_wallet"], task["amount"], on_signed),
+        "COMPLETED",
+    )
 
     if not payout["success"]:
         raise HTTPException(status_code=500, detail=payout["message"])
 
-    updated = db.update_task(data.task_id, {
-        "status": "COMPLETED",
-        "tx_id": payout["tx_id"]
-    })
-
     return {
         "task": updated,
         "payout": payout
@@ -348,7 +890,15 @@ async def ai_verify_task(data: TaskApprove):
     if task["status"] != "SUBMITTED":
         raise HTTPException(status_code=400, detail="Task must be in SUBMITTED status")
 
-    result = await verify_proof(task["description"], task.get("proof_url", ""))
+    result = await verify_proof(task["description"], task.get("proof_url", ""), task.get("deadline"))
+
+    if result["verdict"] == "DEFERRED":
+        # Gemini is degraded — tell the caller to retry later instead of failing the proof
+        raise HTTPException(
+            status_code=503,
+            detail=result["reasoning"],
+            headers={"Retry-After": str(result["retry_after"])}
+        )
 
     return {
         "task_id": data.task_id,
@@ -0,0 +1,180 @@
+"""
+Metrics Module
+Minimal Prometheus-style counters and latency histograms, rendered in the
+text exposition format by GET /metrics. No client library needed.
+
+Counters for caches that keep their own hit/miss numbers (functools.lru_cache,
+the serialized-JSON cache) are filled in at scrape time by collectors
+registered with register_collector().
+"""
+
+import functools
+import inspect
+import time
+from typing import Callable
+
+# Latency buckets in seconds — JSON flushes sit at the low end, algod
+# confirmation waits and Gemini calls at the high end
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: list = []
+_collectors: list = []
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter, optionally labelled."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict = {}  # { label values tuple: float }
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, total: float, **labels):
+        """Overwrite the running total — for collectors mirroring an external count."""
+        self._values[tuple(labels[n] for n in self.labelnames)] = total
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, optionally labelled."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict = {}  # { label values tuple: [bucket counts..., sum, count] }
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    def time(self, **labels) -> "_Timer":
+        """Context manager observing the elapsed time of its block."""
+        return _Timer(self, labels)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            inf = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {series[-1]}")
+            lines.append(f"{self.name}_sum{labels} {series[-2]!r}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+def timed(histogram: Histogram, **labels) -> Callable:
+    """Decorator observing each call's duration (sync or async functions)."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with histogram.time(**labels):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def register_collector(fn: Callable):
+    """Call fn() before each scrape, to refresh metrics kept elsewhere."""
+    _collectors.append(fn)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    for collect in _collectors:
+        collect()
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ─── GigBounty Metrics ───────────────────────────────────────
+
+HTTP_REQUEST_DURATION = Histogram(
+    "gigbounty_http_request_duration_seconds",
+    "Time to response start per route template, method and status code.",
+    ("method", "route", "status"),
+)
+DB_FLUSH_DURATION = Histogram(
+    "gigbounty_db_flush_duration_seconds",
+    "Task store writes: _save_db JSON flushes or SQLite write transactions.",
+    ("backend",),
+)
+ESCROW_CALL_DURATION = Histogram(
+    "gigbounty_escrow_call_duration_seconds",
+    "Algorand indexer/algod calls by escrow operation.",
+    ("operation",),
+)
+AI_VERIFY_PHASE_DURATION = Histogram(
+    "gigbounty_ai_verify_phase_duration_seconds",
+    "verify_proof time per phase: github (fetch + pre-screen), url_check (non-GitHub proofs), gemini (incl. retries).",
+    ("phase",),
+)
+CACHE_REQUESTS = Counter(
+    "gigbounty_cache_requests_total",
+    "Cache lookups by cache and result (hit, miss, revalidated).",
+    ("cache", "result"),
+)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -14,6 +14,24 @@ class TaskStatus(str, Enum):
     DISPUTED = "DISPUTED"
 
 
+def normalize_deadline(value: Optional[str]) -> Optional[str]:
+    """
+    Deadlines are stored as YYYY-MM-DD (the range index compares them as strings).
+
+    Returns:
+        The date as YYYY-MM-DD, or None for an empty value.
+
+    Raises:
+        ValueError if the value is not an ISO date.
+    """
+    if value is None or not value.strip():
+        return None
+    try:
+        return datetime.fromisoformat(value.strip()).date().isoformat()
+    except ValueError:
+        raise ValueError("deadline must be an ISO date (YYYY-MM-DD)")
+
+
 # ─── Request Models ──────────────────────────────────────────
 
 
@@ -25,6 +43,11 @@ class TaskCreate(BaseModel):
     deadline: Optional[str] = None
     tx_id: Optional[str] = None
 
+    @field_validator("deadline")
+    @classmethod
+    def normalize_deadline(cls, value: Optional[str]) -> Optional[str]:
+        return normalize_deadline(value)
+
 
 class TaskClaim(BaseModel):
     task_id: str
@@ -58,6 +81,13 @@ class TaskDispute(BaseModel):
     reason: str = Field(..., min_length=5, max_length=1000)
 
 
+class WalletLogin(BaseModel):
+    """Exchange a signed /auth/challenge message for a session token."""
+    wallet_address: str = Field(..., min_length=10)
+    signature: str = Field(..., min_length=1)
+    message: str = Field(..., min_length=1)
+
+
 # ─── Response Models ─────────────────────────────────────────
 
 
@@ -75,9 +105,12 @@ class TaskResponse(BaseModel):
     tx_id: Optional[str] = None
     dispute_reason: Optional[str] = None
     disputed_by: Optional[str] = None
+    app_id: Optional[int] = None  # per-task escrow app, once deployed (app_factory.py)
+    refund_error: Optional[str] = None  # last error of a refund that gave up (expiry.py)
+    version: int = 1
 
 
 class AIVerifyResponse(BaseModel):
     score: float
-    verdict: str  # "PASS" or "FAIL"
+    verdict: str  # "PASS", "FAIL" or "DEFERRED"
     reasoning: Optional[str] = None
@@ -0,0 +1,127 @@
+"""
+Payout Reconciliation
+Settles payout reservations (payout_pending) that a crash or an unconfirmed
+payment left behind, against the payout's tx ID on chain.
+
+main._pay_out reserves a task, records the payment's tx ID and last valid
+round once it is signed and before it is sent, then finishes the
+transition. A reservation still in place PAYOUT_STALE_SECONDS later is
+settled here, at startup and then every PAYOUT_RECONCILE_SECONDS:
+
+    no tx ID recorded      nothing was sent — the reservation is released
+    confirmed              the transition is finished (status, tx_id)
+    expired unconfirmed    the reservation is released
+    still pending          checked again on the next pass
+
+Admins list stuck payouts and settle one on demand via /admin/payouts.
+Expired tasks' refunds are reserved the same way but settled by expiry.py.
+"""
+
+import asyncio
+import os
+import time
+from typing import Optional
+from dotenv import load_dotenv
+
+import database as db
+import escrow
+
+load_dotenv()
+
+# Reservations younger than this belong to a payout that may still be running
+PAYOUT_STALE_SECONDS = float(os.getenv("PAYOUT_STALE_SECONDS", "300"))
+PAYOUT_RECONCILE_SECONDS = float(os.getenv("PAYOUT_RECONCILE_SECONDS", "60"))
+
+# Clears a reservation and what was recorded for it
+RELEASED = {
+    "payout_pending": False,
+    "payout_status": None,
+    "payout_tx_id": None,
+    "payout_last_valid": None,
+    "payout_reserved_at": None,
+}
+
+_worker: Optional[asyncio.Task] = None
+
+
+def reservation(final_status: str) -> dict:
+    """Updates that reserve a task for a payout ending in `final_status`."""
+    return {"payout_pending": True, "payout_status": final_status, "payout_reserved_at": time.time()}
+
+
+def _stuck(task: dict, now: float) -> bool:
+    return (bool(task.get("payout_pending")) and task["status"] != "EXPIRED"
+            and now - (task.get("payout_reserved_at") or 0) >= PAYOUT_STALE_SECONDS)
+
+
+def stuck_payouts() -> list:
+    """Tasks reserved for a payout for longer than PAYOUT_STALE_SECONDS."""
+    now = time.time()
+    return [task for task in db.get_all_tasks() if _stuck(task, now)]
+
+
+async def settle(task_id: str) -> tuple:
+    """
+    Settle one stuck payout by its recorded tx ID.
+
+    Returns:
+        (outcome, task) — outcome is "completed", "released" or "pending"
+        (the task is then left reserved).
+
+    Raises:
+        ValueError if the task has no stuck payout.
+        database.TaskConflictError if the task changed meanwhile.
+        algosdk errors if algod cannot be reached.
+    """
+    task = db.get_task(task_id)
+    if task is None or not _stuck(task, time.time()):
+        raise ValueError(f"Task {task_id} has no stuck payout")
+
+    tx_id = task.get("payout_tx_id")
+    if tx_id is None:
+        status = "expired"  # reserved, but nothing was ever signed
+    elif escrow.get_algod_client() is None:
+        status = "pending"  # demo mode — no chain to ask
+    else:
+        status = await asyncio.to_thread(escrow.transaction_status, tx_id, task["payout_last_valid"])
+
+    if status == "pending":
+        return "pending", task
+    if status == "confirmed":
+        updates, outcome = {**RELEASED, "status": task["payout_status"], "tx_id": tx_id}, "completed"
+    else:
+        updates, outcome = RELEASED, "released"
+    updated = db.transition_task(
+        task_id, updates, expected_status=task["status"], expected_version=task["version"]
+    )
+    print(f"💸 Stuck payout for task {task_id} {outcome}" + (f" (tx {tx_id})" if tx_id else ""))
+    return outcome, updated
+
+
+async def _reconcile_loop():
+    await asyncio.to_thread(db.load)
+    while True:
+        db.sync()
+        for task in stuck_payouts():
+            try:
+                await settle(task["id"])
+            except (ValueError, db.TaskConflictError):
+                pass  # settled or moved on elsewhere meanwhile
+            except Exception as e:
+                print(f"⚠️  Could not settle the payout for task {task['id']}: {e}")
+        await asyncio.sleep(PAYOUT_RECONCILE_SECONDS)
+
+
+def start():
+    """Start reconciling on the running loop (app startup)."""
+    global _worker
+    if _worker is None:
+        _worker = asyncio.create_task(_reconcile_loop())
+
+
+def stop():
+    """Stop reconciling (app shutdown)."""
+    global _worker
+    if _worker is not None:
+        _worker.cancel()
+        _worker = None
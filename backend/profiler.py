@@ -0,0 +1,143 @@
+"""
+Profiler Module
+On-demand sampling profiler for the live process (GET /admin/profile).
+
+A background thread samples the event loop thread's Python stack every few
+milliseconds via sys._current_frames() for a fixed window, so nothing is
+instrumented and there is no overhead outside a profiling run. Output is
+collapsed stacks ("frame;frame;frame count" lines) for flamegraph.pl or
+speedscope, plus a report of samples caught in known blocking calls on the
+loop thread and the longest stretch the loop went without returning to
+its selector.
+
+Off by default: set PROFILER_ENABLED=true and ADMIN_API_TOKEN (see auth.require_admin).
+"""
+
+import os
+import sys
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+
+# (file, function) frames that block the event loop when reached on its thread
+BLOCKING_CALLS = {
+    ("database.py", "_save_db"): "sync JSON file write",
+    ("storage.py", "_write"): "sync SQLite write transaction",
+    ("transaction.py", "wait_for_confirmation"): "sync algod confirmation wait",
+    ("algod.py", "send_transaction"): "sync algod transaction submit",
+    ("indexer.py", "search_transactions"): "sync indexer lookup",
+    ("indexer.py", "transaction"): "sync indexer lookup",
+}
+
+# Leaf frames that mean the loop is idle: waiting in the selector (asyncio),
+# or inside uvloop's C run loop with no Python callback running
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("runners.py", "run"),
+    ("base_events.py", "run_forever"),
+    ("base_events.py", "run_until_complete"),
+}
+
+_busy = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profiling run is already in progress."""
+
+
+def _frame_key(frame) -> tuple:
+    return os.path.basename(frame.f_code.co_filename), frame.f_code.co_name
+
+
+def _stack(frame) -> list:
+    """[(file, function)...] from the outermost frame to the leaf."""
+    stack = []
+    while frame is not None:
+        stack.append(_frame_key(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def sample(thread_id: int, seconds: float, interval: float) -> dict:
+    """
+    Sample one thread's stack for `seconds` (blocking; run it off the loop).
+
+    Args:
+        thread_id: threading ident of the thread to profile (the event loop's)
+        seconds: Sampling window, capped at PROFILER_MAX_SECONDS
+        interval: Seconds between samples
+
+    Returns:
+        { seconds, interval_ms, samples, idle_samples, longest_stall_ms,
+          blocking: [{ call, reason, samples, est_ms }], collapsed: str }
+
+    Raises:
+        ProfilerBusy if another run holds the profiler.
+    """
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusy("A profiling run is already in progress")
+    try:
+        seconds = max(0.1, min(seconds, PROFILER_MAX_SECONDS))
+        counts: dict = {}     # { collapsed stack: samples }
+        blocking: dict = {}   # { (file, function): samples }
+        samples = idle = 0
+        stall_started = None
+        longest_stall = 0.0
+
+        deadline = time.perf_counter() + seconds
+        while (now := time.perf_counter()) < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                break
+            stack = _stack(frame)
+            del frame
+            samples += 1
+
+            if stack and stack[-1] in _IDLE_FRAMES:
+                idle += 1
+                if stall_started is not None:
+                    longest_stall = max(longest_stall, now - stall_started)
+                    stall_started = None
+            elif stall_started is None:
+                stall_started = now
+
+            for key in stack:
+                if key in BLOCKING_CALLS:
+                    blocking[key] = blocking.get(key, 0) + 1
+                    break
+
+            collapsed = ";".join(f"{file}:{func}" for file, func in stack)
+            counts[collapsed] = counts.get(collapsed, 0) + 1
+            time.sleep(interval)
+
+        if stall_started is not None:
+            longest_stall = max(longest_stall, time.perf_counter() - stall_started)
+
+        return {
+            "seconds": round(seconds, 3),
+            "interval_ms": round(interval * 1000, 3),
+            "samples": samples,
+            "idle_samples": idle,
+            "longest_stall_ms": round(longest_stall * 1000, 1),
+            "blocking": sorted(
+                (
+                    {
+                        "call": f"{file}:{func}",
+                        "reason": BLOCKING_CALLS[(file, func)],
+                        "samples": n,
+                        "est_ms": round(n * seconds * 1000 / samples, 1) if samples else 0,
+                    }
+                    for (file, func), n in blocking.items()
+                ),
+                key=lambda b: -b["samples"],
+            ),
+            "collapsed": "\n".join(f"{stack} {n}" for stack, n in sorted(counts.items(), key=lambda kv: -kv[1])),
+        }
+    finally:
+        _busy.release()
@@ -0,0 +1,118 @@
+"""
+Full-Text Search Module
+In-memory inverted index over task titles and descriptions, ranked with BM25.
+Kept up to date incrementally by database.py on create/update/delete.
+"""
+
+import heapq
+import math
+import re
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Title terms count this many times towards term frequency
+TITLE_WEIGHT = 2
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "that", "the", "this", "to", "with", "you", "your",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Inverted index
+_postings: dict = {}   # { term: { task_id: tf } }
+_doc_terms: dict = {}  # { task_id: { term: tf } } — needed to remove a doc
+_doc_len: dict = {}    # { task_id: weighted token count }
+_total_len: int = 0
+
+
+def tokenize(text: str) -> list:
+    """Lower-case alphanumeric tokens, minus stopwords and single characters."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def index_task(task: dict):
+    """Add or replace a task's title/description in the index."""
+    global _total_len
+    task_id = task["id"]
+    if task_id in _doc_terms:
+        remove_task(task_id)
+
+    terms: dict = {}
+    for term in tokenize(task.get("title") or ""):
+        terms[term] = terms.get(term, 0) + TITLE_WEIGHT
+    for term in tokenize(task.get("description") or ""):
+        terms[term] = terms.get(term, 0) + 1
+
+    for term, tf in terms.items():
+        _postings.setdefault(term, {})[task_id] = tf
+    _doc_terms[task_id] = terms
+    length = sum(terms.values())
+    _doc_len[task_id] = length
+    _total_len += length
+
+
+def remove_task(task_id: str):
+    """Drop a task from the index (no-op if it isn't indexed)."""
+    global _total_len
+    terms = _doc_terms.pop(task_id, None)
+    if terms is None:
+        return
+    for term in terms:
+        posting = _postings.get(term)
+        if posting is not None:
+            posting.pop(task_id, None)
+            if not posting:
+                del _postings[term]
+    _total_len -= _doc_len.pop(task_id, 0)
+
+
+def rebuild(tasks):
+    """Rebuild the whole index from an iterable of task dicts."""
+    global _total_len
+    _postings.clear()
+    _doc_terms.clear()
+    _doc_len.clear()
+    _total_len = 0
+    for task in tasks:
+        index_task(task)
+
+
+def search(query: str, limit: int = 20, offset: int = 0, accept=None) -> tuple:
+    """
+    Rank indexed tasks against a query with BM25.
+
+    Args:
+        query: Free-text query; a task matches if it contains any query term
+        limit, offset: Pagination over the ranked results
+        accept: Optional predicate task_id -> bool (e.g. a status filter)
+
+    Returns:
+        (total_matches, [(task_id, score), ...]) for the requested page.
+    """
+    terms = set(tokenize(query))
+    n_docs = len(_doc_len)
+    if not terms or not n_docs:
+        return 0, []
+
+    avgdl = _total_len / n_docs
+    scores: dict = {}
+    # Rarest terms first so the candidate set is built from the smallest lists
+    for term in sorted(terms, key=lambda t: len(_postings.get(t, ()))):
+        posting = _postings.get(term)
+        if not posting:
+            continue
+        df = len(posting)
+        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        for task_id, tf in posting.items():
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * _doc_len[task_id] / avgdl)
+            scores[task_id] = scores.get(task_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+
+    if accept is not None:
+        scores = {task_id: score for task_id, score in scores.items() if accept(task_id)}
+
+    top = heapq.nlargest(offset + limit, scores.items(), key=lambda item: (item[1], item[0]))
+    return len(scores), top[offset:offset + limit]
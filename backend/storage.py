@@ -0,0 +1,273 @@
+"""
+Shared Storage Module
+SQLite-backed store that lets several uvicorn worker processes share tasks,
+wallet roles, used tx_ids and auth nonces (STORAGE_BACKEND=sqlite).
+
+The default STORAGE_BACKEND=json keeps the original single-process JSON
+files. In SQLite mode every task write bumps a global sequence number and
+appends to a `changes` table; each worker keeps its in-memory copy (and
+indexes/caches) current by applying changes past the last seq it has seen
+(see database.sync).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+from dotenv import load_dotenv
+
+import metrics
+import tracing
+
+load_dotenv()
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").lower()
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./gigbounty.db")
+
+# Rows kept in the `changes` table; workers further behind do a full reload
+CHANGES_RETAIN = int(os.getenv("SQLITE_CHANGES_RETAIN", "100000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY, task_id TEXT NOT NULL, type TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS wallet_roles (address TEXT PRIMARY KEY, role TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS used_tx_ids (tx_id TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS auth_nonces (
+    nonce TEXT PRIMARY KEY, wallet TEXT NOT NULL, expires_at REAL NOT NULL,
+    client TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS auth_nonces_expiry ON auth_nonces (expires_at);
+CREATE INDEX IF NOT EXISTS auth_nonces_wallet ON auth_nonces (wallet, expires_at);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('seq', '0');
+"""
+
+
+def _resolve_path(url: str) -> str:
+    """sqlite:///relative/or/absolute.db → filesystem path (relative to backend/)."""
+    path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else url
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(__file__), path)
+    return os.path.normpath(path)
+
+
+class SQLiteStore:
+    """One connection per process; writes use BEGIN IMMEDIATE so workers serialize."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(auth_nonces)")}
+        if "client" not in columns:
+            # Created before nonces were capped per client IP
+            self._conn.execute("ALTER TABLE auth_nonces ADD COLUMN client TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS auth_nonces_client ON auth_nonces (client, expires_at)")
+
+    def _write(self, fn: Callable):
+        """Run fn(conn) inside an IMMEDIATE transaction and return its result."""
+        with tracing.span("db.sqlite_write"), self._lock, metrics.DB_FLUSH_DURATION.time(backend="sqlite"):
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _read(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # ─── Tasks ────────────────────────────────────────────────
+
+    @staticmethod
+    def _next_seq(conn, task_id: str, event_type: str) -> int:
+        seq = int(conn.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()[0]) + 1
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'seq'", (str(seq),))
+        conn.execute("INSERT INTO changes (seq, task_id, type) VALUES (?, ?, ?)", (seq, task_id, event_type))
+        if seq % 1000 == 0:
+            conn.execute("DELETE FROM changes WHERE seq <= ?", (seq - CHANGES_RETAIN,))
+        return seq
+
+    def head_seq(self) -> int:
+        """Sequence number of the latest committed task change."""
+        return int(self._read("SELECT value FROM meta WHERE key = 'seq'")[0][0])
+
+    def load_tasks(self) -> tuple:
+        """(all task dicts, head seq) read in one snapshot."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                rows = self._conn.execute("SELECT data FROM tasks").fetchall()
+                seq = int(self._conn.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()[0])
+            finally:
+                self._conn.execute("COMMIT")
+        return [json.loads(r[0]) for r in rows], seq
+
+    def changes_since(self, seq: int) -> list:
+        """[(seq, task_id, type, current task dict or None)] for changes after seq."""
+        rows = self._read(
+            "SELECT c.seq, c.task_id, c.type, t.data FROM changes c "
+            "LEFT JOIN tasks t ON t.id = c.task_id WHERE c.seq > ? ORDER BY c.seq",
+            (seq,),
+        )
+        return [(s, tid, typ, json.loads(data) if data else None) for s, tid, typ, data in rows]
+
+    def insert_task(self, task: dict) -> int:
+        """Insert a new task (stamping change_seq); returns its change seq."""
+        def fn(conn):
+            seq = self._next_seq(conn, task["id"], "created")
+            task["change_seq"] = seq
+            conn.execute("INSERT INTO tasks (id, data) VALUES (?, ?)", (task["id"], json.dumps(task, default=str)))
+            return seq
+        return self._write(fn)
+
+    def modify_task(self, task_id: str, mutate: Callable) -> Optional[dict]:
+        """
+        Atomically read-modify-write one task. `mutate(current)` returns the
+        new task dict or raises to abort (e.g. a failed compare-and-set).
+        Returns the stored task, or None if it doesn't exist.
+        """
+        def fn(conn):
+            row = conn.execute("SELECT data FROM tasks WHERE id = ?", (task_id,)).fetchone()
+            if row is None:
+                return None
+            task = mutate(json.loads(row[0]))
+            task["change_seq"] = self._next_seq(conn, task_id, "updated")
+            conn.execute("UPDATE tasks SET data = ? WHERE id = ?", (json.dumps(task, default=str), task_id))
+            return task
+        return self._write(fn)
+
+    def delete_task(self, task_id: str) -> bool:
+        def fn(conn):
+            if conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount == 0:
+                return False
+            self._next_seq(conn, task_id, "deleted")
+            return True
+        return self._write(fn)
+
+    def import_tasks(self, tasks: list):
+        """One-off migration of JSON tasks; no-op unless the store has never had a task."""
+        def fn(conn):
+            if conn.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()[0] != "0":
+                return
+            for task in tasks:
+                task["change_seq"] = self._next_seq(conn, task["id"], "created")
+                conn.execute(
+                    "INSERT OR IGNORE INTO tasks (id, data) VALUES (?, ?)",
+                    (task["id"], json.dumps(task, default=str)),
+                )
+        self._write(fn)
+
+    # ─── Wallet Roles ─────────────────────────────────────────
+
+    def get_role(self, address: str) -> Optional[str]:
+        rows = self._read("SELECT role FROM wallet_roles WHERE address = ?", (address,))
+        return rows[0][0] if rows else None
+
+    def set_role(self, address: str, role: str):
+        self._write(lambda conn: conn.execute(
+            "INSERT INTO wallet_roles (address, role) VALUES (?, ?) "
+            "ON CONFLICT(address) DO UPDATE SET role = excluded.role",
+            (address, role),
+        ))
+
+    def import_roles(self, roles: dict):
+        """One-off migration of wallet_roles.json; no-op once the table has rows."""
+        def fn(conn):
+            if conn.execute("SELECT 1 FROM wallet_roles LIMIT 1").fetchone() is None:
+                conn.executemany("INSERT INTO wallet_roles (address, role) VALUES (?, ?)", list(roles.items()))
+        self._write(fn)
+
+    # ─── Used tx_ids (double-spend protection) ────────────────
+
+    def is_tx_used(self, tx_id: str) -> bool:
+        return bool(self._read("SELECT 1 FROM used_tx_ids WHERE tx_id = ?", (tx_id,)))
+
+    def mark_tx_used(self, tx_id: str) -> bool:
+        """Record a tx_id; False if another worker already recorded it."""
+        return self._write(lambda conn: conn.execute(
+            "INSERT OR IGNORE INTO used_tx_ids (tx_id) VALUES (?)", (tx_id,)
+        ).rowcount == 1)
+
+    def import_used_tx_ids(self, tx_ids):
+        """Merge tx_ids from used_tx_ids.json (idempotent)."""
+        self._write(lambda conn: conn.executemany(
+            "INSERT OR IGNORE INTO used_tx_ids (tx_id) VALUES (?)", [(t,) for t in tx_ids]
+        ))
+
+    # ─── Auth Nonces ──────────────────────────────────────────
+
+    def put_nonce(self, nonce: str, wallet: str, client: str, expires_at: float,
+                  per_wallet_max: int, per_client_max: int, store_max: int):
+        """
+        Store a nonce, then enforce the caps the same way auth.issue_challenge
+        does in memory: the wallet's and the client's own oldest nonces go
+        first, and over store_max the oldest of the client holding the most.
+        """
+        def trim(conn, column: str, key: str, limit: int):
+            conn.execute(
+                f"DELETE FROM auth_nonces WHERE {column} = ? AND nonce NOT IN ("
+                f"SELECT nonce FROM auth_nonces WHERE {column} = ? ORDER BY expires_at DESC LIMIT ?)",
+                (key, key, max(limit, 1)),
+            )
+
+        def fn(conn):
+            conn.execute("DELETE FROM auth_nonces WHERE expires_at <= ?", (time.time(),))
+            conn.execute(
+                "INSERT INTO auth_nonces (nonce, wallet, expires_at, client) VALUES (?, ?, ?, ?)",
+                (nonce, wallet, expires_at, client),
+            )
+            trim(conn, "wallet", wallet, per_wallet_max)
+            trim(conn, "client", client, per_client_max)
+            excess = conn.execute("SELECT COUNT(*) FROM auth_nonces").fetchone()[0] - store_max
+            for _ in range(max(excess, 0)):
+                conn.execute(
+                    "DELETE FROM auth_nonces WHERE nonce = (SELECT nonce FROM auth_nonces WHERE client = "
+                    "(SELECT client FROM auth_nonces GROUP BY client ORDER BY COUNT(*) DESC LIMIT 1) "
+                    "ORDER BY expires_at LIMIT 1)"
+                )
+        self._write(fn)
+
+    def get_nonce(self, nonce: str) -> Optional[tuple]:
+        """(wallet, expires_at) for an outstanding nonce, or None."""
+        rows = self._read("SELECT wallet, expires_at FROM auth_nonces WHERE nonce = ?", (nonce,))
+        return tuple(rows[0]) if rows else None
+
+    def consume_nonce(self, nonce: str) -> bool:
+        """Delete a nonce; False if another worker consumed it first."""
+        return self._write(lambda conn: conn.execute(
+            "DELETE FROM auth_nonces WHERE nonce = ?", (nonce,)
+        ).rowcount == 1)
+
+    # ─── Shared Secrets ───────────────────────────────────────
+
+    def get_or_create_secret(self, key: str, generate: Callable) -> str:
+        """A value shared by all workers (e.g. the session HMAC key), created once."""
+        def fn(conn):
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)", (key, generate()))
+            return conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+        return self._write(fn)
+
+
+_store: Optional[SQLiteStore] = None
+
+
+def get_store() -> Optional[SQLiteStore]:
+    """The process-wide SQLite store, or None in single-process JSON mode."""
+    global _store
+    if STORAGE_BACKEND != "sqlite":
+        return None
+    if _store is None:
+        _store = SQLiteStore(_resolve_path(DATABASE_URL))
+    return _store
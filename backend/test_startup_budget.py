@@ -0,0 +1,91 @@
+"""
+GigBounty — Startup Import-Time Budget Check
+
+Cold starts pay for `import main` before the port is bound, so that import
+must stay cheap: no task/role JSON loaded, no algosdk/nacl/pyteal/httpx
+imported. Everything else happens in the lifespan warm-up (see GET /ready).
+
+USAGE:
+  python test_startup_budget.py
+  python test_startup_budget.py --budget-ms 800 --runs 7
+
+This script will:
+  - Import main.py in fresh interpreters (--runs times) and take the median
+  - Fail if the median exceeds the budget (STARTUP_IMPORT_BUDGET_MS, default 1500)
+  - Fail if the import pulled in a lazily-loaded SDK or loaded the task board
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+
+# Imported on first use or by the warm-up — never by `import main`
+LAZY_MODULES = ("algosdk", "nacl", "pyteal", "httpx")
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "ms": elapsed * 1000,
+    "eager": [m for m in %r if m in sys.modules],
+    "db_loaded": main.db._loaded,
+}))
+""" % (LAZY_MODULES,)
+
+
+def measure() -> dict:
+    env = {**os.environ, "PROFILER_ENABLED": "false", "TRACE_EXPORT_FILE": ""}
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        capture_output=True, text=True, env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        print(proc.stderr)
+        sys.exit(f"❌ import main failed (exit {proc.returncode})")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if `import main` exceeds its time budget")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    timings = sorted(r["ms"] for r in runs)
+    median = statistics.median(timings)
+
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"median import time {median:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    eager = sorted({m for r in runs for m in r["eager"]})
+    if eager:
+        failures.append(f"imported at startup instead of lazily: {', '.join(eager)}")
+    if any(r["db_loaded"] for r in runs):
+        failures.append("task board was loaded at import time (should happen in the warm-up)")
+
+    print("=" * 60)
+    print("  GigBounty — Startup Import Budget")
+    print("=" * 60)
+    print(f"  Runs:     {args.runs}")
+    print(f"  Import:   median {median:.0f} ms  (min {timings[0]:.0f}, max {timings[-1]:.0f})")
+    print(f"  Budget:   {args.budget_ms:.0f} ms")
+    print("=" * 60)
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Startup is within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Tracing Module
+Lightweight request tracing: spans with W3C trace/span IDs, carried across
+handlers, storage, escrow and AI calls by a context variable.
+
+Every request gets a trace ID (taken from an incoming `traceparent` header
+when present) that is returned in the X-Trace-Id response header. When
+TRACE_EXPORT_FILE is set, each finished trace is appended to that file as
+one line of OTLP/JSON (an ExportTraceServiceRequest), written by a
+background thread so the event loop never waits on the file. Without an
+exporter, child spans are no-ops and only the trace ID is kept.
+"""
+
+import functools
+import inspect
+import json
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "gigbounty-api")
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current: ContextVar = ContextVar("gigbounty_span", default=None)
+
+
+class Span:
+    """One timed operation; children share the trace and buffer of their root."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "is_root", "attributes", "start_ns",
+                 "end_ns", "error", "_trace_spans", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], trace_spans: list,
+                 attributes: dict, is_root: bool = False):
+        self.name = name
+        self.is_root = is_root
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+        self._trace_spans = trace_spans
+        self._token = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self._token)
+        self._trace_spans.append(self)
+        if self.is_root and _exporter is not None:
+            _exporter.export(self._trace_spans)
+        return False
+
+
+class _NoopSpan:
+    """Stand-in when no exporter is configured — keeps call sites unconditional."""
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes) -> Span:
+    """Root span for a request; continues the caller's trace if `traceparent` is valid."""
+    match = _TRACEPARENT_RE.match(traceparent or "")
+    trace_id, parent_id = (match.group(1), match.group(2)) if match else (secrets.token_hex(16), None)
+    return Span(name, trace_id, parent_id, [], attributes, is_root=True)
+
+
+def span(name: str, **attributes):
+    """
+    Child span of the current span:
+
+        with tracing.span("escrow.send_transaction", tx_id=tx_id):
+            ...
+
+    A no-op outside a trace or when no exporter is configured.
+    """
+    parent = _current.get()
+    if parent is None or _exporter is None:
+        return _NOOP
+    return Span(name, parent.trace_id, parent.span_id, parent._trace_spans, attributes)
+
+
+def traced(name: str) -> Callable:
+    """Decorator wrapping each call (sync or async) in a child span."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    return current.trace_id if current is not None else None
+
+
+# ─── OTLP/JSON File Exporter ─────────────────────────────────
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(s: Span) -> dict:
+    out = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": 2 if s.is_root else 1,  # SERVER for the request span, INTERNAL otherwise
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+        "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+    }
+    if s.parent_id is not None:
+        out["parentSpanId"] = s.parent_id
+    return out
+
+
+class _FileExporter:
+    """Appends one OTLP/JSON line per finished trace from a daemon thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: queue.Queue = queue.Queue(maxsize=10000)
+        threading.Thread(target=self._run, name="trace-exporter", daemon=True).start()
+
+    def export(self, spans: list):
+        try:
+            self._queue.put_nowait(list(spans))
+        except queue.Full:
+            pass  # drop traces rather than block requests
+
+    def _run(self):
+        while True:
+            spans = self._queue.get()
+            payload = {
+                "resourceSpans": [{
+                    "resource": {"attributes": [
+                        {"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}},
+                        {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+                    ]},
+                    "scopeSpans": [{
+                        "scope": {"name": "gigbounty.tracing"},
+                        "spans": [_otlp_span(s) for s in spans],
+                    }],
+                }]
+            }
+            try:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(payload, default=str) + "\n")
+            except OSError as e:
+                print(f"⚠️  trace export to {self.path} failed: {e}")
+
+
+_exporter: Optional[_FileExporter] = _FileExporter(TRACE_EXPORT_FILE) if TRACE_EXPORT_FILE else None
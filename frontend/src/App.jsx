@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { Routes, Route, useNavigate } from 'react-router-dom';
 import './App.css';
 import Navbar from './components/Navbar';
@@ -107,26 +107,74 @@ function App() {
   const [useDemo, setUseDemo] = useState(false);
   const navigate = useNavigate();
 
-  // Fetch tasks from backend or use demo data
+  // Change version the board is synced to (0 = nothing loaded yet)
+  const versionRef = useRef(0);
+
+  // Merge changed/deleted tasks into the board, keeping it newest first.
+  // A task is only replaced by one at least as new (per-task version).
+  const mergeTasks = useCallback((changed, deletedIds = []) => {
+    setTasks(prev => {
+      const byId = new Map(prev.map(t => [t.id, t]));
+      for (const id of deletedIds) byId.delete(id);
+      for (const task of changed) {
+        const current = byId.get(task.id);
+        if (!current || (task.version ?? 0) >= (current.version ?? 0)) {
+          byId.set(task.id, { ...current, ...task });
+        }
+      }
+      return [...byId.values()].sort((a, b) => (a.created_at < b.created_at ? 1 : -1));
+    });
+  }, []);
+
+  // Fetch tasks from backend or use demo data. After the first (full) load
+  // this is a delta sync: only tasks changed since versionRef come back.
   const fetchTasks = useCallback(async () => {
-    setLoading(true);
     try {
-      const data = await api.getTasks();
-      setTasks(data);
+      // Summary view: card fields only; TaskDetailPage fetches the full task
+      const delta = await api.getTaskChanges(versionRef.current, { view: 'summary' });
+      if (delta.full) {
+        setTasks(delta.tasks);
+      } else {
+        mergeTasks(delta.tasks, delta.deleted.map(d => d.id));
+      }
+      versionRef.current = Math.max(versionRef.current, delta.version);
       setUseDemo(false);
     } catch (err) {
-      console.log('Backend not available, using demo data');
-      setTasks(DEMO_TASKS);
-      setUseDemo(true);
+      if (versionRef.current === 0) {
+        console.log('Backend not available, using demo data');
+        setTasks(DEMO_TASKS);
+        setUseDemo(true);
+      }
     } finally {
       setLoading(false);
     }
-  }, []);
+  }, [mergeTasks]);
 
   useEffect(() => {
     fetchTasks();
   }, [fetchTasks]);
 
+  // Live updates over SSE once the backend is known to be up. Every
+  // (re)connect catches up with a delta sync first, so nothing sent while
+  // disconnected is missed; a resync event does the same.
+  useEffect(() => {
+    if (useDemo || loading) return;
+    const source = api.streamTasks((event) => {
+      if (event.type === 'resync') {
+        fetchTasks();
+        return;
+      }
+      if (event.seq <= versionRef.current) return;
+      versionRef.current = event.seq;
+      if (event.type === 'deleted') {
+        mergeTasks([], [event.task.id]);
+      } else {
+        mergeTasks([event.task]);
+      }
+    }, { onOpen: fetchTasks });
+    return () => source.close();
+  }, [useDemo, loading, fetchTasks, mergeTasks]);
+
   // Show toast notification
   const showToast = (message, type = 'success') => {
     setToast({ message, type });
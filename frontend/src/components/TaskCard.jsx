@@ -80,8 +80,8 @@ export default function TaskCard({ task, walletAddress, onClaim, onSubmitProof,
       {/* ── Title ── */}
       <h3 className="tc-title">{title}</h3>
 
-      {/* ── Description ── */}
-      <p className="tc-desc">{description}</p>
+      {/* ── Description (not in the board's summary view) ── */}
+      {description && <p className="tc-desc">{description}</p>}
 
       {/* ── Divider ── */}
       <div className="tc-divider" />
@@ -115,7 +115,7 @@ export default function HomePage({ tasks, walletAddress, onConnect }) {
                 <h3 className="task-card-title">{task.title}</h3>
                 <span className={`badge badge-${task.status?.toLowerCase()}`}>{task.status}</span>
               </div>
-              <p className="task-card-description">{task.description}</p>
+              {task.description && <p className="task-card-description">{task.description}</p>}
               <div className="task-card-meta">
                 <div className="task-card-bounty">
                   {task.amount} <span className="algo-symbol">ALGO</span>
@@ -83,7 +83,7 @@ export default function MyTasksPage({ tasks, walletAddress }) {
             >
               <div className="my-task-row-main">
                 <h3 className="my-task-row-title">{task.title}</h3>
-                <p className="my-task-row-desc">{task.description}</p>
+                {task.description && <p className="my-task-row-desc">{task.description}</p>}
               </div>
               <div className="my-task-row-meta">
                 <span className={`badge ${statusClasses[task.status]}`}>{task.status}</span>
@@ -1,5 +1,5 @@
 import { useParams, useNavigate } from 'react-router-dom';
-import { useState } from 'react';
+import { useState, useEffect } from 'react';
 import StepperHorizontal from '../components/StepperHorizontal';
 import { useRole } from '../context/RoleContext';
 import { api } from '../services/api';
@@ -7,7 +7,20 @@ import { api } from '../services/api';
 export default function TaskDetailPage({ tasks, walletAddress, onClaim, onSubmitProof, onApprove, onCancel, onDispute, useDemo }) {
   const { id } = useParams();
   const navigate = useNavigate();
-  const task = tasks.find(t => t.id === id);
+  // The board holds summary fields only; load the full task (description,
+  // proof, dispute) here, again whenever the summary's version moves on
+  const summary = tasks.find(t => t.id === id);
+  const [details, setDetails] = useState(null);
+  useEffect(() => {
+    if (useDemo) return;
+    let cancelled = false;
+    api.getTask(id)
+      .then((full) => { if (!cancelled) setDetails(full); })
+      .catch(() => {});
+    return () => { cancelled = true; };
+  }, [id, useDemo, summary?.version]);
+  const fresh = details?.id === id && (!summary || details.version >= summary.version);
+  const task = fresh ? details : summary;
   const [disputeReason, setDisputeReason] = useState('');
   const [showDisputeForm, setShowDisputeForm] = useState(false);
   const { role: userRole } = useRole();
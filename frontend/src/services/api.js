@@ -39,12 +39,43 @@ async function request(path, options = {}) {
 }
 
 export const api = {
-  // Get all tasks
-  getTasks: () => request('/tasks'),
+  // Get all tasks; optional filters: { min_amount, max_amount, deadline_after, deadline_before, sort,
+  //   fields: "title,amount,...", view: "summary" }
+  getTasks: (filters = {}) => {
+    const params = new URLSearchParams(
+      Object.entries(filters).filter(([, v]) => v !== undefined && v !== null && v !== '')
+    ).toString();
+    return request(`/tasks${params ? `?${params}` : ''}`);
+  },
 
   // Get single task by ID
   getTask: (taskId) => request(`/tasks/${taskId}`),
 
+  // Delta sync: tasks changed since a change version (0 = full board);
+  // optional projection: { fields, view }
+  getTaskChanges: (since = 0, { fields, view } = {}) => {
+    const params = new URLSearchParams({ since });
+    if (fields) params.set('fields', fields);
+    if (view) params.set('view', view);
+    return request(`/tasks/changes?${params}`);
+  },
+
+  // Subscribe to task changes (SSE). Returns the EventSource; call .close() to stop.
+  // onEvent receives { seq, type: 'created'|'updated'|'deleted'|'resync', task };
+  // onOpen runs on every (re)connect, e.g. to catch up with getTaskChanges
+  streamTasks: (onEvent, { status, wallet, onOpen } = {}) => {
+    const params = new URLSearchParams();
+    if (status) params.set('status', status);
+    if (wallet) params.set('wallet', wallet);
+    const query = params.toString();
+    const source = new EventSource(`${API_BASE}/tasks/stream${query ? `?${query}` : ''}`);
+    if (onOpen) source.onopen = onOpen;
+    for (const type of ['created', 'updated', 'deleted', 'resync']) {
+      source.addEventListener(type, (e) => onEvent(JSON.parse(e.data)));
+    }
+    return source;
+  },
+
   // Create a new task
   createTask: (data) =>
     request('/task/create', {